@@ -0,0 +1,171 @@
+"""
+Compares the JSON providers of the API on realistic payloads.
+
+Usage (from the repository root):
+
+    make benchmark
+"""
+
+from worf.api.app import json_providers
+from worf.models import User
+from worf.plugins.organizations.models import Organization
+from worf.plugins.billing.models import (
+    Customer,
+    Invoice,
+    Price,
+    Product,
+    Subscription,
+    SubscriptionItem,
+    SubscriptionProvider,
+    TaxRate,
+)
+
+from flask import Flask
+
+import datetime
+import timeit
+import uuid
+import json
+
+
+def base_values(i):
+    now = datetime.datetime.utcnow()
+    return {
+        "id": i,
+        "ext_id": uuid.uuid4(),
+        "created_at": now - datetime.timedelta(days=i),
+        "updated_at": now,
+        "data": {"index": i, "tags": ["a", "b"]},
+    }
+
+
+def users(n):
+    return {
+        "users": [
+            User(
+                email="user-{}@example.com".format(i),
+                display_name="user {}".format(i),
+                language="en",
+                superuser=False,
+                disabled=False,
+                **base_values(i)
+            ).export()
+            for i in range(n)
+        ],
+        "has_more": False,
+    }
+
+
+def subscriptions(n):
+    today = datetime.date.today()
+    product = Product(name="Pro", active=True, type="service", **base_values(0))
+    price = Price(
+        name="Pro (monthly)",
+        active=True,
+        billing_interval="month",
+        unit_amount=4900,
+        currency="eur",
+        type="recurring",
+        restricted=False,
+        usage_type="licensed",
+        product=product,
+        **base_values(0)
+    )
+    tax_rate = TaxRate(
+        jurisdiction="DE",
+        inclusive=False,
+        percentage=19.0,
+        valid_from=today,
+        active=True,
+        name="VAT",
+        **base_values(0)
+    )
+    data = []
+    for i in range(n):
+        organization = Organization(
+            name="Organization {}".format(i), active=True, **base_values(i)
+        )
+        customer = Customer(
+            organization=organization,
+            name="Customer {}".format(i),
+            street="Street 1",
+            city="Berlin",
+            zip_code="10115",
+            country="DE",
+            email="billing-{}@example.com".format(i),
+            **base_values(i)
+        )
+        subscription = Subscription(
+            customer=customer,
+            status="active",
+            start_date=today,
+            providers=[
+                SubscriptionProvider(provider="stripe", active=True, **base_values(i))
+            ],
+            items=[
+                SubscriptionItem(
+                    price=price, tax_rate=tax_rate, quantity=1, **base_values(i)
+                )
+            ],
+            **base_values(i)
+        )
+        data.append(subscription.export())
+    return {"data": data}
+
+
+def invoices(n):
+    today = datetime.date.today()
+    data = []
+    for i in range(n):
+        invoice = Invoice(
+            provider="stripe",
+            date=today,
+            paid_at=today,
+            period_start=today,
+            period_end=today + datetime.timedelta(days=30),
+            amount=4900,
+            tax=931,
+            currency="eur",
+            discount=0,
+            status="paid",
+            number="INV-{:06d}".format(i),
+            customer_name="Customer {}".format(i),
+            **base_values(i)
+        )
+        values = invoice.snapshot()
+        del values["pdf"]
+        data.append(values)
+    return {"data": data}
+
+
+def main():
+    app = Flask(__name__)
+    payloads = {
+        "users": users(1000),
+        "subscriptions": subscriptions(200),
+        "invoices": invoices(1000),
+    }
+    print("{:<15} {:<8} {:>10} {:>10}".format("payload", "provider", "ms/call", "kB"))
+    for payload_name, payload in payloads.items():
+        outputs = {}
+        for provider_name, provider_class in json_providers.items():
+            provider = provider_class(app)
+            dumps = lambda: provider.dumps(payload, separators=(",", ":"))
+            outputs[provider_name] = dumps()
+            number = 20
+            duration = timeit.timeit(dumps, number=number) / number
+            print(
+                "{:<15} {:<8} {:>10.2f} {:>10.1f}".format(
+                    payload_name,
+                    provider_name,
+                    duration * 1000,
+                    len(outputs[provider_name]) / 1024,
+                )
+            )
+        # all providers need to produce the same data
+        decoded = [json.loads(output) for output in outputs.values()]
+        assert all(d == decoded[0] for d in decoded)
+
+
+if __name__ == "__main__":
+    main()
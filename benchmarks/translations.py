@@ -0,0 +1,71 @@
+"""
+Measures the throughput of `Resource.t` with several threads translating
+concurrently, using the translation catalog and the previous lookup via
+`Settings.get` as a reference.
+
+Usage (from the repository root):
+
+    make benchmark
+"""
+
+from worf.settings import settings
+from worf.api.resource import Resource
+
+from concurrent.futures import ThreadPoolExecutor
+
+import time
+
+KEYS = [
+    ("invalid-data", {}),
+    ("not-found", {}),
+    ("users.already-exists", {}),
+    ("billing-invoice-mail-text", {"number": "INV-000001"}),
+]
+
+
+class SettingsGetResource(Resource):
+
+    """
+    Translates with the lookup that was used before the catalog existed.
+    """
+
+    def t(self, key, *args, **kwargs):
+        translation = settings.get("translations.{}.{}".format(key, self.language))
+        if not translation:
+            return "[no translation for language {} and key {}]".format(
+                self.language, key
+            )
+        return translation.format(*args, **kwargs)
+
+
+def translate(resource, n):
+    for _ in range(n):
+        for key, kwargs in KEYS:
+            resource.t(key, **kwargs)
+
+
+def run(resource_class, threads, n):
+    resource = resource_class()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in range(threads):
+            executor.submit(translate, resource, n)
+    return time.perf_counter() - start
+
+
+def main():
+    settings.translation_catalog
+    n = 20000
+    print("{:<12} {:>8} {:>14}".format("lookup", "threads", "calls/s"))
+    for threads in (1, 4, 16):
+        for name, resource_class in (
+            ("settings.get", SettingsGetResource),
+            ("catalog", Resource),
+        ):
+            duration = run(resource_class, threads, n)
+            calls = threads * n * len(KEYS)
+            print("{:<12} {:>8} {:>14,.0f}".format(name, threads, calls / duration))
+
+
+if __name__ == "__main__":
+    main()
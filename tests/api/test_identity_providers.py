@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+from worf.api.identity_providers import (
+    IdentityProviderClient,
+    IdentityProviderUnavailable,
+)
+
+import threading
+
+
+class TestIdentityProviderClient(TestCase):
+    def test_run(self):
+        client = IdentityProviderClient(max_workers=2, max_queued=0, timeout=1)
+        assert client.run(lambda x: x * 2, 21) == 42
+        with self.assertRaises(ValueError):
+            client.run(int, "foo")
+
+    def test_timeout(self):
+        client = IdentityProviderClient(max_workers=1, max_queued=0, timeout=0.1)
+        event = threading.Event()
+        try:
+            with self.assertRaises(IdentityProviderUnavailable):
+                client.run(event.wait)
+            # the single worker is still busy, so further calls are rejected
+            with self.assertRaises(IdentityProviderUnavailable):
+                client.run(lambda: None)
+        finally:
+            event.set()
+        client.executor.shutdown(wait=True)
+        assert client.slots.acquire(blocking=False)
+
+    def test_sessions(self):
+        client = IdentityProviderClient(max_workers=1, max_queued=0, timeout=1)
+        assert client.run(client.session) is client.run(client.session)
@@ -0,0 +1,50 @@
+from worf.tests.helpers import DatabaseTest
+from worf.tests.fixtures import normal_user
+from worf.api.resource import Resource
+from worf.settings import settings
+from worf.models import User
+
+from flask import Flask
+
+
+class UserNameResource(Resource):
+    def __init__(self, status_code=None):
+        self.status_code = status_code
+
+    def post(self):
+        # the session is committed when the unit of work ends
+        session = settings.get_session()
+        session.query(User).one().display_name = "Max"
+        if self.status_code is None:
+            raise ValueError("something went wrong")
+        return {}, self.status_code
+
+
+class TestUnitOfWork(DatabaseTest):
+    fixtures = [{"normal_user": normal_user}]
+
+    def setUp(self):
+        super().setUp()
+        # units of work create their own sessions
+        settings.sessionmaker.remove()
+        self.app = Flask(__name__)
+
+    def handle(self, resource):
+        with self.app.test_request_context("/", method="POST"):
+            settings.begin_unit_of_work()
+            try:
+                _, status_code = resource.handle("POST")
+            finally:
+                settings.end_unit_of_work()
+        self.session.expire_all()
+        return status_code
+
+    def test_failed_requests_are_rolled_back(self):
+        assert self.handle(UserNameResource()) == 500
+        assert self.session.query(User).one().display_name != "Max"
+        assert self.handle(UserNameResource(503)) == 503
+        assert self.session.query(User).one().display_name != "Max"
+
+    def test_successful_requests_are_committed(self):
+        assert self.handle(UserNameResource(200)) == 200
+        assert self.session.query(User).one().display_name == "Max"
@@ -57,3 +57,27 @@ class TestAccessTokens(ApiTest):
         )
 
         assert response.status_code == 200
+
+    def test_deleted_access_token_is_rejected(self):
+        # we use the access token once so that it gets cached
+        response = self._authenticated_request(
+            self.normal_user,
+            requests.get,
+            "/user",
+            access_token=self.access_token,
+        )
+        assert response.status_code == 200
+
+        response = self.authenticated_delete(
+            url="/access-tokens/{}".format(self.access_token.ext_id),
+            user=self.normal_user,
+        )
+        assert response.status_code == 200
+
+        response = self._authenticated_request(
+            self.normal_user,
+            requests.get,
+            "/user",
+            access_token=self.access_token,
+        )
+        assert response.status_code == 401
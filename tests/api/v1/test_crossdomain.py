@@ -0,0 +1,48 @@
+from worf.tests.helpers import ApiTest
+from worf.settings import settings
+import requests
+
+
+class TestCrossDomain(ApiTest):
+
+    """
+    Test the cross-domain (CORS) headers
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        settings.set("crossdomain.enabled", False)
+        settings.set("crossdomain.origins", None)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpClass(cls):
+        settings.set("crossdomain.enabled", True)
+        settings.set(
+            "crossdomain.origins",
+            ["https://app.example.com", r"https://[\w-]+\.example\.org"],
+        )
+        super().setUpClass()
+
+    def test_preflight(self):
+        for origin in ("https://app.example.com", "https://test.example.org"):
+            response = requests.options(
+                self.url("/access-tokens"),
+                headers={
+                    "Origin": origin,
+                    "Access-Control-Request-Headers": "Authorization",
+                },
+            )
+            assert response.status_code == 200
+            assert response.headers["Access-Control-Allow-Origin"] == origin
+            assert (
+                response.headers["Access-Control-Allow-Methods"] == "GET, POST, DELETE"
+            )
+            assert response.headers["Access-Control-Allow-Headers"] == "Authorization"
+
+    def test_invalid_origin(self):
+        response = requests.options(
+            self.url("/access-tokens"), headers={"Origin": "https://example.com"}
+        )
+        assert response.status_code == 200
+        assert "Access-Control-Allow-Origin" not in response.headers
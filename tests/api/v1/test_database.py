@@ -0,0 +1,17 @@
+from worf.tests.helpers import ApiTest
+from worf.tests.fixtures import super_user, normal_user
+
+
+class TestDatabasePool(ApiTest):
+    fixtures = [{"super_user": super_user}, {"normal_user": normal_user}]
+
+    def test_pool_status(self):
+        response = self.authenticated_get(url="/database/pool", user=self.normal_user)
+        assert response.status_code == 403
+
+        response = self.authenticated_get(url="/database/pool", user=self.super_user)
+        assert response.status_code == 200
+        pool = response.json()["pool"]
+        assert pool["checkouts"] > 0
+        assert pool["checked_out"] >= 1
+        assert pool["size"] == 5
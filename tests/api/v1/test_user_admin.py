@@ -3,7 +3,9 @@ from worf.models import User, AccessToken, SignupRequest
 from worf.settings import settings
 from worf.tests.fixtures import super_user, normal_user
 import requests
+import hashlib
 import queue
+import json
 import re
 
 
@@ -35,6 +37,91 @@ class TestUserAdmin(ApiTest):
         assert "user" in data
         assert data["user"]["id"] == users[0]["id"]
 
+    def test_list_users_not_modified(self):
+        response = self.authenticated_get(url="/users", user=self.super_user)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        # without an ETag of the client the version isn't computed
+        assert etag.strip('"') == hashlib.sha256(response.content).hexdigest()
+
+        response = self.authenticated_get(
+            url="/users", user=self.super_user, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] != etag
+        etag = response.headers["ETag"]
+
+        # the version ETag is recognized as well
+        response = self.authenticated_get(
+            url="/users", user=self.super_user, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        # adding a user changes the ETag
+        user_data = {
+            "email": "foobar@bar.com",
+            "display_name": "max.mustermann",
+            "language": "en",
+        }
+        response = self.authenticated_post(
+            url="/users", user=self.super_user, json=user_data
+        )
+        assert response.status_code == 201
+
+        response = self.authenticated_get(
+            url="/users", user=self.super_user, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert len(response.json()["users"]) == 3
+
+    def test_list_users_with_cursor(self):
+        response = self.authenticated_get(
+            url="/users", user=self.super_user, params={"limit": 1}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["users"]) == 1
+        assert data["has_more"]
+        first_user = data["users"][0]
+
+        response = self.authenticated_get(
+            url="/users",
+            user=self.super_user,
+            params={"limit": 1, "cursor": data["next_cursor"]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["users"]) == 1
+        assert not data["has_more"]
+        assert data["next_cursor"] is None
+        assert data["users"][0]["id"] != first_user["id"]
+
+        response = self.authenticated_get(
+            url="/users", user=self.super_user, params={"cursor": "foo"}
+        )
+        assert response.status_code == 400
+
+    def test_stream_users(self):
+        response = self.authenticated_get(
+            url="/users", user=self.super_user, params={"stream": "1"}
+        )
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        users = [json.loads(line) for line in response.text.splitlines()]
+        assert len(users) == 2
+        assert {user["id"] for user in users} == {
+            str(self.super_user.ext_id),
+            str(self.normal_user.ext_id),
+        }
+
+        response = self.authenticated_get(
+            url="/users",
+            user=self.super_user,
+            headers={"Accept": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == 2
+
     def test_create_user(self):
         user_data = {
             "email": "foobar@bar.com",
@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from worf.utils.crypto import Crypto
+
+from cryptography.fernet import Fernet, InvalidToken
+
+
+class TestCrypto(TestCase):
+    def test_encrypt_decrypt(self):
+        crypto = Crypto([Fernet.generate_key()])
+        data = {"email": "max@example.com"}
+        assert crypto.decrypt(crypto.encrypt(data)) == data
+
+    def test_key_rotation(self):
+        old_key, new_key = Fernet.generate_key(), Fernet.generate_key()
+        old_crypto = Crypto([old_key])
+        token = old_crypto.encrypt({"foo": "bar"})
+
+        crypto = Crypto([new_key, old_key])
+        assert crypto.decrypt(token) == {"foo": "bar"}
+        rotated_token = crypto.rotate(token)
+        with self.assertRaises(InvalidToken):
+            old_crypto.decrypt(rotated_token)
+        assert Crypto([new_key]).decrypt(rotated_token) == {"foo": "bar"}
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from worf.utils.lazy import Lazy, resolve
+
+import os.path
+
+
+class TestLazy(TestCase):
+    def test_lazy(self):
+        join = Lazy("os.path:join")
+        assert not join.resolved
+        assert join("a", "b") == os.path.join("a", "b")
+        assert join.resolve() is os.path.join
+        assert join.__module__ == "os.path"
+        assert join.__name__ == "join"
+
+    def test_resolve(self):
+        config = {"api": [{"routes": Lazy("os.path:sep"), "version": "v1"}]}
+        assert resolve(config) == {"api": [{"routes": os.path.sep, "version": "v1"}]}
+        # the config itself is not modified
+        assert isinstance(config["api"][0]["routes"], Lazy)
@@ -0,0 +1,99 @@
+from worf.tests.helpers import DatabaseTest
+from worf.tests.fixtures import normal_user
+from worf.settings import settings
+from worf.models import User
+
+from sqlalchemy import update
+
+
+class TestReadReplica(DatabaseTest):
+
+    """
+    Test the routing of reads to the read replica, which is simulated by a
+    second engine for the test database.
+    """
+
+    fixtures = [{"normal_user": normal_user}]
+
+    def setUp(self):
+        super().setUp()
+        # units of work create their own sessions
+        settings.sessionmaker.remove()
+        settings.set("db.replica.url", settings.get("db.url"))
+        # writers pinned by other tests are forgotten
+        settings.replica_router = None
+
+    def tearDown(self):
+        settings.set("db.replica.url", None)
+        settings.dispose_replica()
+
+    def test_reads_go_to_replica(self):
+        with settings.unit_of_work():
+            settings.set_unit_of_work_owner(self.normal_user.id)
+            with settings.read_only():
+                with settings.session() as session:
+                    assert session.get_bind().engine is settings.replica_engine
+                    assert session.query(User).count() == 1
+            with settings.session() as session:
+                assert session.get_bind().engine is settings.engine
+
+    def test_reads_follow_writes(self):
+        with settings.unit_of_work():
+            settings.set_unit_of_work_owner(self.normal_user.id)
+            with settings.session() as session:
+                user = session.query(User).one()
+                user.display_name = "Max"
+            with settings.read_only():
+                with settings.session() as session:
+                    assert session.get_bind().engine is settings.engine
+
+        # the owner is pinned to the primary for a while
+        with settings.unit_of_work():
+            settings.set_unit_of_work_owner(self.normal_user.id)
+            with settings.read_only():
+                with settings.session() as session:
+                    assert session.get_bind().engine is settings.engine
+
+        # other users are not
+        with settings.unit_of_work():
+            with settings.read_only():
+                with settings.session() as session:
+                    assert session.get_bind().engine is settings.replica_engine
+
+    def test_reads_follow_bulk_writes(self):
+        with settings.unit_of_work():
+            with settings.session() as session:
+                session.execute(update(User).values(display_name="Max"))
+            with settings.read_only():
+                with settings.session() as session:
+                    assert session.get_bind().engine is settings.engine
+
+    def test_writes_without_replica_reads(self):
+        # the first unit of work never touches the replica
+        with settings.unit_of_work():
+            settings.set_unit_of_work_owner(self.normal_user.id)
+            with settings.session() as session:
+                user = session.query(User).one()
+                user.display_name = "Max"
+        assert settings.replica_engine is None
+
+        with settings.unit_of_work():
+            settings.set_unit_of_work_owner(self.normal_user.id)
+            with settings.read_only():
+                with settings.session() as session:
+                    assert session.get_bind().engine is settings.engine
+
+        # pins survive the disposal of the replica engine
+        settings.dispose_replica()
+        with settings.unit_of_work():
+            settings.set_unit_of_work_owner(self.normal_user.id)
+            with settings.read_only():
+                with settings.session() as session:
+                    assert session.get_bind().engine is settings.engine
+
+    def test_lagging_replica(self):
+        settings.get_replica_router().max_lag = -1
+        with settings.unit_of_work():
+            with settings.read_only():
+                with settings.session() as session:
+                    assert session.get_bind().engine is settings.engine
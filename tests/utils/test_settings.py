@@ -0,0 +1,118 @@
+from unittest import TestCase
+
+from worf.utils.settings import Settings, load_settings, thaw
+
+import tempfile
+import os
+
+
+class TestPluginRegistry(TestCase):
+    def setUp(self):
+        self.settings = Settings(
+            {
+                "plugins": {
+                    "organizations": {"module": "worf.plugins.organizations"},
+                    "password": {"module": "worf.plugins.password"},
+                }
+            }
+        )
+
+    def test_plugin_apis(self):
+        apis = self.settings.get_plugin_apis()
+        assert set(apis.keys()) == {"organizations", "password"}
+        # the registry is only built once
+        assert self.settings.plugin_registry is self.settings.plugin_registry
+        assert self.settings.get_plugin_exports("user") == []
+        assert self.settings.get_plugin_includes("user") == []
+
+    def test_reload_plugin_registry(self):
+        registry = self.settings.plugin_registry
+        self.settings.set("plugins.password", None)
+        assert set(self.settings.get_plugin_apis().keys()) == {
+            "organizations",
+            "password",
+        }
+        assert self.settings.reload_plugin_registry() is not registry
+        assert set(self.settings.get_plugin_apis().keys()) == {"organizations"}
+
+
+class TestSettingsLookup(TestCase):
+    def setUp(self):
+        self.settings = Settings({"api": {"cache": {"size": 10}}, "test": True})
+
+    def test_get(self):
+        assert self.settings.get("api.cache.size") == 10
+        assert self.settings.get("api.cache") == {"size": 10}
+        assert self.settings.get("api.foo") is None
+        assert self.settings.get("api.foo", 1) == 1
+        assert self.settings.get("test.foo", 1) == 1
+
+    def test_invalidation(self):
+        assert self.settings.get("api.cache.size") == 10
+        self.settings.set("api.cache.size", 20)
+        assert self.settings.get("api.cache.size") == 20
+        self.settings.update({"api": {"cache": {"ttl": 30}}})
+        assert self.settings.get("api.cache.ttl") == 30
+        self.settings.set("api.cache", None)
+        assert self.settings.get("api.cache.size") is None
+
+    def test_returned_values(self):
+        # returned values are read-only, so they can't get out of sync
+        with self.assertRaises(TypeError):
+            self.settings.get("api.cache")["size"] = 20
+        with self.assertRaises(TypeError):
+            self.settings.get("api")["foo"] = "bar"
+        assert self.settings.get("api.cache") is self.settings.get("api.cache")
+        cache = thaw(self.settings.get("api.cache"))
+        cache["size"] = 20
+        assert cache == {"size": 20}
+        assert self.settings.get("api.cache.size") == 10
+
+    def test_frozen(self):
+        frozen = self.settings.frozen
+        assert frozen.get("api.cache.size") == 10
+        assert frozen["api.cache"]["size"] == 10
+        with self.assertRaises(TypeError):
+            frozen["api.cache"]["size"] = 20
+        assert self.settings.frozen is frozen
+        self.settings.set("api.cache.size", 20)
+        assert frozen.get("api.cache.size") == 10
+        assert self.settings.frozen.get("api.cache.size") == 20
+
+
+class TestLoadSettings(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, "cache")
+        self.filenames = []
+        for name, content in (
+            ("a.yml", "api:\n  size: 1\npath: '{cwd}/foo'\n"),
+            ("b.yml", "api:\n  ttl: 2\n"),
+        ):
+            filename = os.path.join(self.directory.name, name)
+            with open(filename, "w") as f:
+                f.write(content)
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_cache(self):
+        expected = {
+            "api": {"size": 1, "ttl": 2},
+            "path": "{}/foo".format(self.directory.name),
+        }
+        assert load_settings(self.filenames) == expected
+        assert load_settings(self.filenames, cache_dir=self.cache_dir) == expected
+        assert len(os.listdir(self.cache_dir)) == 1
+        # the cache contains secrets
+        (cache_file,) = os.listdir(self.cache_dir)
+        mode = os.stat(os.path.join(self.cache_dir, cache_file)).st_mode
+        assert mode & 0o777 == 0o600
+        assert load_settings(self.filenames, cache_dir=self.cache_dir) == expected
+
+        # changing a file invalidates the cache
+        with open(self.filenames[1], "w") as f:
+            f.write("api:\n  ttl: 3\n")
+        settings = load_settings(self.filenames, cache_dir=self.cache_dir)
+        assert settings["api"] == {"size": 1, "ttl": 3}
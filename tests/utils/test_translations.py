@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from worf.utils.translations import TranslationCatalog
+
+
+class TestTranslationCatalog(TestCase):
+    def setUp(self):
+        self.catalog = TranslationCatalog(
+            {
+                "greeting": {"en": "Hello {name}", "de": "Hallo {name}"},
+                "users": {"not-found": {"en": "not found", "de-at": "{{nix}}"}},
+                "broken": {"en": "Hello {name"},
+            }
+        )
+
+    def test_get(self):
+        assert self.catalog.get("de", "greeting").format(name="Max") == "Hallo Max"
+        assert self.catalog.get("de-at", "greeting").format(name="Max") == "Hallo Max"
+        assert self.catalog.get("de-at", "users.not-found").format() == "{nix}"
+        assert self.catalog.get("fr", "users.not-found").format() == "not found"
+        assert self.catalog.get("de", "users.not-found").format() == "not found"
+        assert self.catalog.get("en", "foo") is None
+
+    def test_report(self):
+        assert self.catalog.missing["de"] == ["broken", "users.not-found"]
+        assert [error[:2] for error in self.catalog.errors] == [("broken", "en")]
+        assert self.catalog.get("en", "broken") is None
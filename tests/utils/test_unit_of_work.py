@@ -0,0 +1,74 @@
+from worf.tests.helpers import DatabaseTest
+from worf.tests.fixtures import normal_user
+from worf.settings import settings
+from worf.models import User
+
+
+class TestUnitOfWork(DatabaseTest):
+
+    """
+    Test that a unit of work commits its changes once, when it ends.
+    """
+
+    fixtures = [{"normal_user": normal_user}]
+
+    def setUp(self):
+        super().setUp()
+        # units of work create their own sessions
+        settings.sessionmaker.remove()
+        self.engine = settings.get_db_engine()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def display_name(self):
+        # we look at the database from a separate connection
+        with self.engine.connect() as connection:
+            return connection.exec_driver_sql(
+                'SELECT display_name FROM "user" WHERE id = {:d}'.format(
+                    self.normal_user.id
+                )
+            ).scalar()
+
+    def set_display_name(self, display_name):
+        with settings.session() as session:
+            session.query(User).one().display_name = display_name
+
+    def test_single_commit(self):
+        display_name = self.display_name()
+        with settings.unit_of_work():
+            self.set_display_name("Max")
+            assert self.display_name() == display_name
+        assert self.display_name() == "Max"
+
+    def test_failing_block(self):
+        with settings.unit_of_work():
+            self.set_display_name("Max")
+            try:
+                with settings.session() as session:
+                    session.query(User).one().display_name = "Maria"
+                    raise ValueError("something went wrong")
+            except ValueError:
+                pass
+        # only the changes of the failing block are undone
+        assert self.display_name() == "Max"
+
+    def test_delayed_tasks(self):
+        if settings.worker is None:
+            settings.initialize_worker()
+        calls = []
+
+        def task(display_name):
+            calls.append((display_name, self.display_name()))
+
+        with settings.unit_of_work():
+            self.set_display_name("Max")
+            settings.delay(task, display_name="Max")
+            assert calls == []
+        # the task sees the changes of the unit of work
+        assert calls == [("Max", "Max")]
+
+        settings.begin_unit_of_work()
+        settings.delay(task, display_name="Maria")
+        settings.end_unit_of_work(commit=False)
+        assert calls == [("Max", "Max")]
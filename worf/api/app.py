@@ -1,9 +1,12 @@
 from flask import Flask, jsonify, request
 from flask.json.provider import DefaultJSONProvider
 from urllib.parse import urlparse
+from types import MappingProxyType
 import traceback
 import datetime
+import decimal
 import logging
+import orjson
 import json
 import uuid
 
@@ -71,13 +74,35 @@ def get_app(settings, routes=routes):
     o = urlparse(settings.get("url"))
     app = Flask(__name__)
     app.before_request(add_ip_info)
+    app.before_request(settings.begin_unit_of_work)
+
+    @app.after_request
+    def commit_unit_of_work(response):
+        # we commit before the response is sent, so clients don't receive a
+        # success response for changes that couldn't be committed
+        try:
+            settings.commit_unit_of_work()
+        except:
+            logger.error(traceback.format_exc())
+            settings.fail_unit_of_work()
+            response = jsonify({"message": "Internal server error"})
+            response.status_code = 500
+        return response
+
+    @app.teardown_request
+    def end_unit_of_work(exc):
+        try:
+            settings.end_unit_of_work(commit=exc is None)
+        except:
+            logger.error(traceback.format_exc())
+
     app.register_blueprint(main, url_prefix="/app")
     app.register_error_handler(404, page_not_found)
     app.register_error_handler(405, method_not_allowed)
     app.url_map.converters["regex"] = RegexConverter
     configure(app, settings, (("v1", routes),), o.path)
     app.handle_exception = handle_exception
-    app.json = CustomJSONProvider(app)
+    app.json = json_providers[settings.get("api.json_serializer", "orjson")](app)
     return app
 
 
@@ -86,6 +111,41 @@ class CustomJSONProvider(DefaultJSONProvider):
         return json.dumps(obj, *args, cls=Encoder, **kwargs)
 
 
+class FastJSONProvider(CustomJSONProvider):
+
+    """
+    Serializes data with orjson, which handles datetimes, dates and UUIDs
+    natively and produces the same representation as `Encoder` for them.
+    Other types are handled by `Encoder`, and if orjson can't serialize the
+    data at all (e.g. integers with more than 64 bits) we fall back to the
+    standard library encoder.
+
+    Unlike the standard library encoder, orjson does not escape non-ASCII
+    characters and renders timezone-aware datetimes with a non-UTC offset
+    with that offset instead of converting them to UTC. All datetime columns
+    are stored without timezone, so this does not affect exported models.
+    """
+
+    options = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.default = Encoder().default
+
+    def dumps(self, obj, *args, **kwargs):
+        option = self.options
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get("sort_keys"):
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode(
+                "utf-8"
+            )
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, *args, **kwargs)
+
+
 class Encoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, datetime.datetime):
@@ -96,4 +156,13 @@ class Encoder(json.JSONEncoder):
             return obj.isoformat()
         elif isinstance(obj, uuid.UUID):
             return str(obj)
+        elif isinstance(obj, decimal.Decimal):
+            # we use a string to not lose precision
+            return str(obj)
+        elif isinstance(obj, MappingProxyType):
+            # e.g. a (read-only) settings value
+            return dict(obj)
         return super().default(obj)
+
+
+json_providers = {"json": CustomJSONProvider, "orjson": FastJSONProvider}
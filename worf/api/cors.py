@@ -0,0 +1,98 @@
+from worf.settings import settings
+
+from cachetools import LRUCache
+
+import threading
+import re
+
+METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+# characters that keep an origin pattern from matching itself (a "." matches
+# any character including itself, so it is not contained here)
+REGEX_CHARACTERS = re.compile(r"[\\^$*+?{}\[\]|()]")
+
+
+class CrossDomain:
+
+    """
+    Decides which origins may access the API and generates the corresponding
+    cross-domain (CORS) headers.
+
+    Origin patterns from the `crossdomain.origins` setting are matched against
+    the beginning of the origin, as with `re.match`. They are compiled into a
+    single regular expression when they change, patterns without special
+    characters are additionally checked with a set lookup, and decisions are
+    cached per origin.
+    """
+
+    def __init__(self, cache_size=1024):
+        self.lock = threading.Lock()
+        self.cache_size = cache_size
+        self.compile([])
+        self.methods = {}
+
+    def compile(self, origins):
+        self.origins = list(origins)
+        self.exact_origins = frozenset(
+            origin for origin in origins if not REGEX_CHARACTERS.search(origin)
+        )
+        if origins:
+            self.regex = re.compile(
+                "|".join("(?:{})".format(origin) for origin in origins)
+            )
+        else:
+            self.regex = None
+        self.decisions = LRUCache(maxsize=self.cache_size)
+
+    def origin_allowed(self, origin, origins):
+        with self.lock:
+            if origins != self.origins:
+                self.compile(origins)
+            allowed = self.decisions.get(origin)
+            if allowed is not None:
+                return allowed
+            allowed = origin in self.exact_origins or (
+                self.regex is not None and self.regex.match(origin) is not None
+            )
+            self.decisions[origin] = allowed
+            return allowed
+
+    def allowed_methods(self, resource_class):
+        """
+        Returns the methods a resource class implements as a header value.
+        """
+        methods = self.methods.get(resource_class)
+        if methods is None:
+            methods = ", ".join(
+                [
+                    method
+                    for method in METHODS
+                    if hasattr(resource_class, method.lower())
+                ]
+            )
+            self.methods[resource_class] = methods
+        return methods
+
+    def add_headers(self, resource, request, response):
+        opts = settings.get("crossdomain")
+        if not opts or not opts.get("enabled", False):
+            return
+
+        origin = request.headers.get("Origin")
+
+        if not origin or not self.origin_allowed(origin, opts.get("origins", [])):
+            return
+
+        # we add cross-domain headers
+        response.headers["Access-Control-Allow-Origin"] = origin
+        # we allow all methods that are defined in the class
+        response.headers["Access-Control-Allow-Methods"] = self.allowed_methods(
+            type(resource)
+        )
+        response.headers["Access-Control-Max-Age"] = str(opts.get("max-age", 120))
+        response.headers["Access-Control-Allow-Headers"] = request.headers.get(
+            "Access-Control-Request-Headers", ", ".join(opts.get("allowed-headers", []))
+        )
+
+
+crossdomain = CrossDomain()
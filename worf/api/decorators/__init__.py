@@ -1 +1,2 @@
 from .user import authorized, AuthError
+from .database import read_only
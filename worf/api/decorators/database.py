@@ -0,0 +1,24 @@
+from worf.settings import settings
+
+from flask import request
+from functools import wraps
+
+
+def read_only(f):
+    """
+    Marks an endpoint as read-only, so its queries can go to the read replica
+    (if one is configured and it is up to date). Needs to be placed below
+    `authorized`, as authorization may write to the primary.
+    """
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with settings.read_only():
+            primary_session = getattr(request, "session", None)
+            request.session = settings.get_session()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                request.session = primary_session
+
+    return decorated_function
@@ -6,12 +6,14 @@ import re
 
 from worf.settings import settings
 from worf.models import AccessToken, User
+from worf.api.token_cache import access_token_cache
+from worf.api.token_usage import access_token_usage
 
 from flask import request, redirect, url_for
 from functools import wraps
 
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, contains_eager
 from sqlalchemy.sql import and_
 
 logger = logging.getLogger(__name__)
@@ -75,22 +77,32 @@ def authorized(
 
             with settings.session() as session:
                 try:
-                    access_token = (
-                        session.query(AccessToken)
-                        .filter(
-                            and_(
-                                AccessToken.token == access_token_key,
-                                AccessToken.valid == True,
+                    access_token = access_token_cache.get(session, access_token_key)
+                    if access_token is None:
+                        # we load the token and its user with a single query
+                        access_token = (
+                            session.query(AccessToken)
+                            .join(AccessToken.user)
+                            .options(contains_eager(AccessToken.user))
+                            .filter(
+                                and_(
+                                    AccessToken.token == access_token_key,
+                                    AccessToken.valid == True,
+                                )
                             )
+                            .one()
+                        )
+                        access_token_usage.apply(access_token)
+                        access_token_cache.put(access_token)
+                        user = access_token.user
+                    else:
+                        user = (
+                            session.query(User)
+                            .filter(User.id == access_token.user_id)
+                            .one()
                         )
-                        .one()
-                    )
-                    user = (
-                        session.query(User)
-                        .filter(User.id == access_token.user_id)
-                        .one()
-                    )
                 except NoResultFound:
+                    access_token_cache.invalidate(access_token_key)
                     if anon_ok:
                         return process_anonymously()
                     if redirect_to:
@@ -138,29 +150,41 @@ def authorized(
                     )
 
                 # if this access_token is stored in the staging DB, we update the last_used_at field.
-                access_token.last_used_at = datetime.datetime.utcnow()
-                access_token.last_used_from = request.headers.get(
+                last_used_at = datetime.datetime.utcnow()
+                last_used_from = request.headers.get(
                     "X-Client-IP",
                     request.headers.get("X-Originating-IP", request.remote_addr),
                 )
 
+                valid_until = None
                 if (
                     access_token.renews_when_used
                     and access_token.default_expiration_minutes
                 ):
-                    access_token.valid_until = (
-                        datetime.datetime.utcnow()
-                        + datetime.timedelta(
-                            minutes=access_token.default_expiration_minutes
-                        )
+                    valid_until = last_used_at + datetime.timedelta(
+                        minutes=access_token.default_expiration_minutes
+                    )
+
+                if access_token_usage.enabled:
+                    # we buffer the update and write it together with others
+                    access_token_usage.touch(
+                        access_token, last_used_at, last_used_from, valid_until
                     )
+                    access_token_usage.flush_if_due(session)
+                else:
+                    access_token.last_used_at = last_used_at
+                    access_token.last_used_from = last_used_from
+                    if valid_until is not None:
+                        access_token.valid_until = valid_until
+                    session.add(access_token)
 
-                session.add(access_token)
                 session.commit()
+                access_token_cache.update(access_token)
 
                 request.session = session
                 request.access_token = access_token
                 request.user = user
+                settings.set_unit_of_work_owner(user.id)
 
                 result = f(*args, **kwargs)
                 return result
@@ -0,0 +1,92 @@
+from worf.settings import settings
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import threading
+import requests
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IdentityProviderUnavailable(Exception):
+    pass
+
+
+class IdentityProviderClient:
+
+    """
+    Performs the HTTP requests of the login and signup providers (e.g. the
+    OAuth token exchange) on a bounded pool of worker threads.
+
+    A request thread waits at most `timeout` seconds for a call to complete.
+    If `max_workers` calls are running and `max_queued` calls are waiting
+    already, further calls fail immediately instead of queueing, so a slow
+    identity provider cannot tie up all request threads. In both cases (and
+    if the provider can't be reached) `IdentityProviderUnavailable` is raised.
+
+    Each worker thread keeps its own `requests.Session`, so connections to
+    the providers are reused.
+    """
+
+    def __init__(self, max_workers=8, max_queued=16, timeout=10):
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="identity-provider"
+        )
+        self.slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self.local = threading.local()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            max_workers=settings.get("api.identity_providers.max_workers", 8),
+            max_queued=settings.get("api.identity_providers.max_queued", 16),
+            timeout=settings.get("api.identity_providers.timeout", 10),
+        )
+
+    def session(self):
+        """
+        Returns the HTTP session of the current worker thread.
+        """
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def run(self, f, *args, **kwargs):
+        """
+        Runs `f` on a worker thread and returns its result.
+        """
+        if not self.slots.acquire(blocking=False):
+            logger.warning("Too many pending identity provider requests.")
+            raise IdentityProviderUnavailable("too many pending requests")
+        try:
+            future = self.executor.submit(f, *args, **kwargs)
+        except:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda future: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # a call that is still queued doesn't need to run anymore
+            future.cancel()
+            logger.warning("Timeout of an identity provider request.")
+            raise IdentityProviderUnavailable("timeout")
+        except requests.RequestException as e:
+            logger.warning("Identity provider request failed: {}".format(e))
+            raise IdentityProviderUnavailable(str(e))
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.run(lambda: self.session().request(method, url, **kwargs))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+identity_provider_client = IdentityProviderClient.from_settings(settings)
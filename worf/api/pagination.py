@@ -0,0 +1,104 @@
+from sqlalchemy.sql import and_, or_, false
+
+import datetime
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """
+    Encodes the sort key values of a row as an opaque, URL-safe cursor.
+    """
+    data = [
+        value.isoformat()
+        if isinstance(value, (datetime.date, datetime.datetime))
+        else value
+        for value in values
+    ]
+    s = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(s).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    """
+    Decodes a cursor generated by `encode_cursor` for the given sort columns.
+    """
+    try:
+        s = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(s.decode("utf-8"))
+    except (ValueError, UnicodeError):
+        raise InvalidCursor("invalid cursor")
+    if not isinstance(data, list) or len(data) != len(columns):
+        raise InvalidCursor("invalid cursor")
+    values = []
+    for column, value in zip(columns, data):
+        if value is None:
+            values.append(None)
+            continue
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime.datetime:
+                value = datetime.datetime.fromisoformat(value)
+            elif python_type is datetime.date:
+                value = datetime.date.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise TypeError
+        except (TypeError, ValueError):
+            raise InvalidCursor("invalid cursor")
+        values.append(value)
+    return values
+
+
+def after(columns, values, descending=False):
+    """
+    Returns a filter that selects the rows following the row with the given
+    sort key values in the (ascending or descending) order of the columns.
+
+    PostgreSQL sorts NULL values last in ascending and first in descending
+    order, which is taken into account for nullable columns.
+    """
+    conditions = []
+    equal = []
+    for column, value in zip(columns, values):
+        nullable = getattr(column, "nullable", True)
+        if value is None:
+            following = column.is_not(None) if descending else false()
+            equal.append(column.is_(None))
+        else:
+            following = column < value if descending else column > value
+            if nullable and not descending:
+                following = or_(following, column.is_(None))
+            equal.append(column == value)
+        conditions.append(and_(*(equal[:-1] + [following])))
+    return or_(*conditions)
+
+
+def paginate(query, attributes, limit, cursor=None, offset=0, descending=False):
+    """
+    Orders the query by the given model attributes and returns a page of
+    results as a tuple `(results, has_more, next_cursor)`. The last attribute
+    needs to be unique (e.g. the ID) so that the sort order is total.
+
+    If a cursor is given the page starts directly after the row it points to
+    (keyset pagination), otherwise the page starts at the given offset. One
+    row more than the limit is fetched to find out if there are more rows,
+    so no separate count query is needed.
+    """
+    keys = [attribute.key for attribute in attributes]
+    columns = [attribute.expression for attribute in attributes]
+    if cursor is not None:
+        query = query.filter(after(columns, decode_cursor(cursor, columns), descending))
+    elif offset:
+        query = query.offset(offset)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    results = query.order_by(*order).limit(limit + 1).all()
+    has_more = len(results) > limit
+    results = results[:limit]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor([getattr(results[-1], key) for key in keys])
+    return results, has_more, next_cursor
@@ -1,14 +1,23 @@
-from flask import jsonify, request, Response, make_response
+from flask import (
+    jsonify,
+    request,
+    Response,
+    make_response,
+    current_app,
+    stream_with_context,
+)
 from flask.views import View
 import traceback
 import time
 import werkzeug
-import re
 import hashlib
 import logging
 
+from sqlalchemy import func
+
 from worf.settings import settings
-from worf.models import Tenant
+from worf.api.tenant_registry import tenant_registry
+from worf.api.cors import crossdomain
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +25,16 @@ logger = logging.getLogger(__name__)
 class NotModified(werkzeug.exceptions.HTTPException):
     code = 304
 
+    def __init__(self, etag=None):
+        super().__init__()
+        # the current ETag, if the client should replace its own
+        self.etag = etag
+
     def get_response(self, environment):
-        return Response(status=304)
+        response = Response(status=304)
+        if self.etag is not None:
+            response.set_etag(self.etag)
+        return response
 
 
 class classproperty(property):
@@ -45,22 +62,98 @@ class Resource(View):
     def t(self, key, *args, **kwargs):
         return settings.translate(self.language, key, *args, **kwargs)
 
-    def add_cache_headers(self, response):
+    @staticmethod
+    def wants_stream():
+        """
+        Returns `True` if the client requested the response as a stream of
+        newline-delimited JSON objects, either via the `stream` parameter or
+        the `Accept` header.
+        """
+        if request.args.get("stream") in ("1", "true"):
+            return True
+        return request.accept_mimetypes.best == "application/x-ndjson"
+
+    def stream(self, query, export, batch_size=None):
+        """
+        Returns a response that streams the results of the given query as
+        newline-delimited JSON (one exported object per line).
+
+        Rows are fetched in batches through a server-side cursor and each
+        object is serialized as soon as it was loaded, so memory use does not
+        depend on the number of results.
+        """
+        if batch_size is None:
+            batch_size = settings.get("api.stream.batch_size", 500)
+        dumps = current_app.json.dumps
+
+        def generate():
+            for obj in query.yield_per(batch_size):
+                yield dumps(export(obj), separators=(",", ":")) + "\n"
+
+        return Response(
+            stream_with_context(generate()), mimetype="application/x-ndjson"
+        )
+
+    @staticmethod
+    def requested_etag():
+        if "if-none-match" not in request.headers:
+            return None
+        etag = request.headers["if-none-match"]
+        # remove quotation marks if present
+        if etag[0] == '"' and etag[-1] == '"':
+            etag = etag[1:-1]
+        # Apache adds a "-gzip" suffix, if it compressed
+        # the JSON on the fly; strip this suffix if it exists
+        if etag[-5:] == "-gzip":
+            etag = etag[:-5]
+        return etag
+
+    @staticmethod
+    def query_version(query, model):
+        """
+        Returns a version identifier for the rows matched by the given query,
+        based on their number and the time of the latest change.
+        """
+        count, changed_at = (
+            query.order_by(None)
+            .with_entities(
+                func.count(model.id),
+                func.max(func.coalesce(model.updated_at, model.created_at)),
+            )
+            .one()
+        )
+        return "{}:{}".format(count, changed_at.isoformat() if changed_at else "")
+
+    def check_etag(self, get_version):
+        """
+        Sets the ETag of the response from a version identifier (e.g. returned
+        by `query_version`) instead of hashing the response body, and raises
+        `NotModified` right away if the client already has this version, so
+        the data does not need to be loaded and serialized.
+
+        `get_version` is only called if the client sent an ETag, so requests
+        of clients without a cached response don't pay for computing the
+        version. Resources should only use this if the version identifier
+        changes whenever the response would change.
+        """
+        requested_etag = self.requested_etag()
+        if requested_etag is None:
+            return
+        user = getattr(request, "user", None)
         digest = hashlib.sha256()
-        digest.update(response.get_data())
-        hexdigest = digest.hexdigest()
-        if "if-none-match" in request.headers:
-            etag = request.headers["if-none-match"]
-            # remove quotation marks if present
-            if etag[0] == '"' and etag[-1] == '"':
-                etag = etag[1:-1]
-            # Apache adds a "-gzip" suffix, if it compressed
-            # the JSON on the fly; strip this suffix if it exists
-            if etag[-5:] == "-gzip":
-                etag = etag[:-5]
-            if etag == hexdigest:
-                raise NotModified
+        digest.update(
+            "{}:{}:{}:{}".format(
+                request.full_path,
+                user.id if user else "",
+                "stream" if self.wants_stream() else "",
+                get_version(),
+            ).encode("utf-8")
+        )
+        request.version_etag = digest.hexdigest()
+        if requested_etag == request.version_etag:
+            raise NotModified
 
+    def add_cache_headers(self, response, status_code):
         h = response.headers
         h[
             "Cache-Control"
@@ -68,56 +161,55 @@ class Resource(View):
         h[
             "Expires"
         ] = "Thu, 01 Dec 1994 16:00:00 GMT"  # definitely in the past => no caching
+
+        # only successful GET responses can be revalidated by the client
+        if request.method != "GET" or status_code != 200:
+            return response
+
+        hexdigest = getattr(request, "version_etag", None)
+        requested_etag = self.requested_etag()
+        # without a version we hash the body, with one the client might still
+        # have the ETag of the body from an earlier response
+        if not response.is_streamed and (
+            hexdigest is None or requested_etag is not None
+        ):
+            # SHA-256 is hardware accelerated on most CPUs and thereby faster
+            # than the other hashes available in hashlib
+            digest = hashlib.sha256()
+            digest.update(response.get_data())
+            if requested_etag == digest.hexdigest():
+                raise NotModified(hexdigest)
+            if hexdigest is None:
+                hexdigest = digest.hexdigest()
+        if hexdigest is None:
+            # we can't hash the body of a stream without consuming it
+            return response
+
         response.set_etag(str(hexdigest))
         return response
 
     def add_crossdomain_headers(self, response):
-        opts = settings.get("crossdomain")
-        if not opts or not opts.get("enabled", False):
-            return
-
-        def origin_allowed(origin, allowed_origins):
-            for allowed_origin in allowed_origins:
-                if re.match(allowed_origin, origin):
-                    return True
-            return False
-
-        origin = request.headers.get("Origin")
-
-        if not origin or not origin_allowed(origin, opts.get("origins", [])):
-            return
-
-        # we add cross-domain headers
-        response.headers["Access-Control-Allow-Origin"] = origin
-        # we allow all methods that are defined in the class
-        response.headers["Access-Control-Allow-Methods"] = ", ".join(
-            [
-                method
-                for method in ("GET", "POST", "PUT", "PATCH", "DELETE")
-                if hasattr(self, method.lower())
-            ]
-        )
-        response.headers["Access-Control-Max-Age"] = str(opts.get("max-age", 120))
-        response.headers["Access-Control-Allow-Headers"] = request.headers.get(
-            "Access-Control-Request-Headers", ", ".join(opts.get("allowed-headers", []))
-        )
+        crossdomain.add_headers(self, request, response)
 
     def handle(self, method, *args, **kwargs):
+        if method == "OPTIONS":
+            # we answer preflight requests right away
+            response = make_response("")
+            self.add_crossdomain_headers(response)
+            return response, 200
+
         start = time.time()
 
-        if method.lower() == "options":
-            response = make_response("")
-            status_code = 200
-        elif not hasattr(self, method.lower()):
+        if not hasattr(self, method.lower()):
             response = self.make_response({"message": "Method forbidden"})
             status_code = 405
             return response, status_code
         else:
             # we add the Tenant object to the request
-            with settings.session() as session:
-                request.tenant = Tenant.get_by_name(session, "KIProtect")
+            request.tenant = tenant_registry.get_by_name("KIProtect")
 
             handler = getattr(self, method.lower())
+            failed = True
             try:
                 handler_response = handler(*args, **kwargs)
                 if isinstance(handler_response, (tuple, list)):
@@ -126,6 +218,9 @@ class Resource(View):
                 else:
                     response = handler_response
                     status_code = response.status_code
+                failed = status_code >= 500
+            except NotModified:
+                raise
             except TypeError as e:
                 response = self.make_response({"message": "An unknown error occured"})
                 logger.error(traceback.format_exc())
@@ -140,9 +235,12 @@ class Resource(View):
                 response = self.make_response({"message": "Internal server error"})
                 logger.error(traceback.format_exc())
                 status_code = 500
+            if failed:
+                # the changes of a failed request must not be committed
+                settings.fail_unit_of_work()
 
         response.headers.add(
             "X-elapsed-time-ms", str("%d" % int((time.time() - start) * 1000))
         )
         self.add_crossdomain_headers(response)
-        return self.add_cache_headers(response), status_code
+        return self.add_cache_headers(response, status_code), status_code
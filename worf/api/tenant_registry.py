@@ -0,0 +1,76 @@
+from worf.settings import settings
+from worf.models import Tenant
+
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TenantRegistry:
+
+    """
+    Keeps snapshots of all tenants in memory, indexed by name and domain, so
+    that `Resource.handle` does not need to query the database for the tenant
+    on every request.
+
+    The registry is loaded on first use and reloaded every `refresh_interval`
+    seconds or after `invalidate` was called. Lookups return a new detached
+    `Tenant` object for every call, so requests never share a tenant object.
+    """
+
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.by_name = None
+        self.by_domain = None
+        self.loaded_at = None
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            refresh_interval=settings.get("api.tenant_registry.refresh_interval", 60)
+        )
+
+    def load(self):
+        with settings.session() as session:
+            tenants = session.query(Tenant).all()
+            by_name = {tenant.name: tenant.snapshot() for tenant in tenants}
+            by_domain = {
+                tenant.domain: tenant.snapshot() for tenant in tenants if tenant.domain
+            }
+        logger.debug("Loaded {} tenants.".format(len(by_name)))
+        return by_name, by_domain
+
+    def refresh(self):
+        by_name, by_domain = self.load()
+        with self.lock:
+            self.by_name, self.by_domain = by_name, by_domain
+            self.loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded_at = None
+
+    def ensure_loaded(self):
+        loaded_at = self.loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.refresh_interval:
+            self.refresh()
+
+    def get_by_name(self, name):
+        self.ensure_loaded()
+        values = self.by_name.get(name)
+        if values is None:
+            return None
+        return Tenant.from_snapshot(values)
+
+    def get_by_domain(self, domain):
+        self.ensure_loaded()
+        values = self.by_domain.get(domain)
+        if values is None:
+            return None
+        return Tenant.from_snapshot(values)
+
+
+tenant_registry = TenantRegistry.from_settings(settings)
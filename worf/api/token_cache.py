@@ -0,0 +1,92 @@
+from worf.settings import settings
+from worf.models import AccessToken
+
+from cachetools import TTLCache
+
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AccessTokenCache:
+
+    """
+    A bounded, thread-safe TTL/LRU cache that resolves access token keys to a
+    snapshot of the corresponding `AccessToken` row, so that `authorized`
+    does not need to look up the token in the database on every request.
+
+    Entries expire after `ttl` seconds, regardless of how often they are used,
+    so changes made by other processes become visible after at most `ttl`
+    seconds. Changes made through the API invalidate the entries immediately.
+    """
+
+    def __init__(self, maxsize=10000, ttl=30, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            maxsize=settings.get("api.access_token_cache.size", 10000),
+            ttl=settings.get("api.access_token_cache.ttl", 30),
+            enabled=settings.get("api.access_token_cache.enabled", True),
+        )
+
+    def get(self, session, key):
+        """
+        Returns an `AccessToken` object attached to the given session for the
+        given token key, or `None` if the token is not in the cache.
+        """
+        if not self.enabled:
+            return None
+        with self.lock:
+            values = self.cache.get(key)
+            if values is None:
+                return None
+            access_token = AccessToken.from_snapshot(values)
+        return session.merge(access_token, load=False)
+
+    def put(self, access_token):
+        if not self.enabled:
+            return
+        values = access_token.snapshot()
+        with self.lock:
+            self.cache[access_token.token] = values
+
+    def update(self, access_token):
+        """
+        Updates an existing cache entry without extending its lifetime.
+        """
+        if not self.enabled:
+            return
+        values = access_token.snapshot()
+        with self.lock:
+            entry = self.cache.get(access_token.token)
+            if entry is not None:
+                entry.update(values)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.cache.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        """
+        Removes all cached access tokens of the given user.
+        """
+        with self.lock:
+            keys = [
+                key
+                for key, values in self.cache.items()
+                if values["user_id"] == user_id
+            ]
+            for key in keys:
+                del self.cache[key]
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+access_token_cache = AccessTokenCache.from_settings(settings)
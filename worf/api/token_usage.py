@@ -0,0 +1,123 @@
+from worf.settings import settings
+from worf.models import AccessToken
+
+from sqlalchemy import update, bindparam, func
+from sqlalchemy.orm.attributes import set_committed_value
+
+import threading
+import logging
+import atexit
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AccessTokenUsage:
+
+    """
+    Buffers the `last_used_at`, `last_used_from` and `valid_until` updates that
+    `authorized` performs for every request and writes them to the database
+    in a single bulk UPDATE at most every `flush_interval` seconds.
+
+    Sliding expiration stays correct within the flush interval: pending
+    updates are applied to tokens loaded by this process, and timestamps in
+    the database are only ever moved forward, so concurrent flushes from
+    different processes do not shorten the validity of a token. If a process
+    dies before flushing, a token may expire up to `flush_interval` seconds
+    early.
+    """
+
+    def __init__(self, flush_interval=10, enabled=True):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            flush_interval=settings.get("api.access_token_usage.flush_interval", 10),
+            enabled=settings.get("api.access_token_usage.write_behind", True),
+        )
+
+    def touch(self, access_token, last_used_at, last_used_from, valid_until=None):
+        """
+        Records the use of an access token. The new values are set on the
+        given object without marking it as modified in its session.
+        """
+        values = {"last_used_at": last_used_at, "last_used_from": last_used_from}
+        if valid_until is not None:
+            values["valid_until"] = valid_until
+        for key, value in values.items():
+            set_committed_value(access_token, key, value)
+        with self.lock:
+            self.pending[access_token.id] = values
+
+    def apply(self, access_token):
+        """
+        Applies pending (not yet flushed) updates to an access token that was
+        loaded from the database.
+        """
+        with self.lock:
+            values = self.pending.get(access_token.id)
+        if values is None:
+            return
+        for key, value in values.items():
+            set_committed_value(access_token, key, value)
+
+    def flush_if_due(self, session):
+        if time.monotonic() - self.last_flush < self.flush_interval:
+            return
+        self.flush(session)
+
+    def flush(self, session):
+        """
+        Writes all pending updates using the given session. The caller is
+        responsible for committing the session.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+        table = AccessToken.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"), table.c.valid == True)
+            .values(
+                last_used_at=func.greatest(
+                    table.c.last_used_at, bindparam("_last_used_at")
+                ),
+                last_used_from=bindparam("_last_used_from"),
+                valid_until=func.greatest(
+                    table.c.valid_until,
+                    func.coalesce(bindparam("_valid_until"), table.c.valid_until),
+                ),
+            )
+        )
+        params = [
+            {
+                "_id": id,
+                "_last_used_at": values["last_used_at"],
+                "_last_used_from": values["last_used_from"],
+                "_valid_until": values.get("valid_until"),
+            }
+            for id, values in pending.items()
+        ]
+        logger.debug("Flushing usage data of {} access tokens...".format(len(params)))
+        session.execute(stmt, params)
+
+
+access_token_usage = AccessTokenUsage.from_settings(settings)
+
+
+@atexit.register
+def flush_access_token_usage():
+    if not access_token_usage.pending:
+        return
+    try:
+        with settings.session() as session:
+            access_token_usage.flush(session)
+    except:
+        logger.error("Could not flush access token usage data on exit.")
@@ -9,6 +9,7 @@ from worf.utils.forms.validators import (
     Optional,
     Integer,
     Choices,
+    Length,
 )
 from .validators import DisplayName, Language
 
@@ -46,6 +47,7 @@ class SuperUserEditForm(Form):
 
 class UsersForm(Form):
     offset = Field([Optional(default=0), Integer(convert=True, min=0)])
+    cursor = Field([Optional(), String(), Length(max=1000)])
     limit = Field([Optional(default=20), Integer(convert=True, min=1, max=1000)])
     direction = Field(
         [Optional(default="desc"), String(), Choices(set(["desc", "asc"]))]
@@ -1,6 +1,7 @@
 from worf.settings import settings
 from worf.models import EMailRequest, CryptoToken
 from worf.api.resource import Resource
+from worf.utils.settings import thaw
 
 from flask import request
 
@@ -12,7 +13,7 @@ def client_settings(settings):
     Returns client settings via the API, which clients can use to e.g.
     discover which services are defined.
     """
-    client_settings = settings.get("client_settings", {}).copy()
+    client_settings = thaw(settings.get("client_settings", {}))
     for provider in settings.providers["client_settings"]:
         client_settings.update(provider())
     providers = defaultdict(list)
@@ -0,0 +1,16 @@
+from worf.settings import settings
+from worf.api.resource import Resource
+
+from ...decorators.user import authorized
+
+
+class DatabasePool(Resource):
+
+    """
+    Returns statistics about the database connection pool of the API process
+    that handles the request (for superusers).
+    """
+
+    @authorized(superuser=True, scopes=("admin",))
+    def get(self):
+        return {"pool": settings.get_pool_status()}, 200
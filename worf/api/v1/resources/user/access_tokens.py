@@ -3,6 +3,7 @@ from ....decorators.user import authorized
 from worf.settings import settings
 from worf.models import AccessToken, User
 from worf.api.resource import Resource
+from worf.api.token_cache import access_token_cache
 from ....decorators.uuid import valid_uuid
 
 import datetime
@@ -226,5 +227,9 @@ class UserAccessTokens(Resource):
             access_token.valid_until = datetime.datetime.utcnow() - datetime.timedelta(
                 minutes=1
             )
+            # we commit before invalidating the cache so that it can't be
+            # repopulated with the still valid token in the meantime
+            session.commit()
+            access_token_cache.invalidate(access_token.token)
 
             return {"message": self.t("success")}, 200
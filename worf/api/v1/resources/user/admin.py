@@ -1,10 +1,13 @@
 from ...forms.user import UsersForm, UserForm, SuperUserEditForm
 
 from ....decorators.user import authorized
+from ....decorators.database import read_only
 from ....decorators.uuid import valid_uuid
 from worf.settings import settings
 from worf.models import User
 from worf.api.resource import Resource
+from worf.api.pagination import paginate, InvalidCursor
+from worf.api.token_cache import access_token_cache
 
 from sqlalchemy.sql import and_
 from flask import request
@@ -12,6 +15,7 @@ from flask import request
 
 class Users(Resource):
     @authorized(superuser=True, scopes=("admin",))
+    @read_only
     @valid_uuid(optional=True)
     def get(self, user_id=None):
         with settings.session() as session:
@@ -35,20 +39,39 @@ class Users(Resource):
 
             users = session.query(User).filter(and_(*queries))
 
+            self.check_etag(lambda: self.query_version(users, User))
+
             joins = []
             for join in joins:
                 users = users.join(join)
 
-            users = (
-                users.order_by(User.email)
-                .limit(params["limit"] + 1)
-                .offset(params["offset"])
-            )
+            if self.wants_stream():
+                return self.stream(
+                    users.order_by(User.email, User.id), lambda user: user.export()
+                )
+
+            try:
+                users, has_more, next_cursor = paginate(
+                    users,
+                    (User.email, User.id),
+                    params["limit"],
+                    cursor=params.get("cursor"),
+                    offset=params["offset"],
+                )
+            except InvalidCursor:
+                return (
+                    {
+                        "message": self.t("invalid-data"),
+                        "errors": {"cursor": ["invalid cursor"]},
+                    },
+                    400,
+                )
 
             return (
                 {
-                    "users": [user.export() for user in users[: params["limit"]]],
-                    "has_more": True if users.count() > params["limit"] else False,
+                    "users": [user.export() for user in users],
+                    "has_more": has_more,
+                    "next_cursor": next_cursor,
                     "params": params,
                 },
                 200,
@@ -106,9 +129,12 @@ class Users(Resource):
                         },
                         400,
                     )
+                params[key] = value
                 setattr(user, key, value)
             # we explicitly commit this to create IDs
             session.commit()
+            if "disabled" in params or "superuser" in params:
+                access_token_cache.invalidate_user(user.id)
             return {"user": user.export()}, 200
 
     @authorized(superuser=True, scopes=("admin",))
@@ -121,4 +147,6 @@ class Users(Resource):
             if user == request.user:
                 return {"message": self.t("users.cannot-delete-own-account")}, 400
             session.delete(user)
+            session.commit()
+            access_token_cache.invalidate_user(user.id)
             return {"message": self.t("success")}, 200
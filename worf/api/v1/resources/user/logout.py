@@ -1,6 +1,7 @@
 from ....decorators.user import authorized
 
 from worf.api.resource import Resource
+from worf.api.token_cache import access_token_cache
 from worf.settings import settings
 from flask import jsonify, request
 
@@ -11,6 +12,7 @@ class Logout(Resource):
         with settings.session() as session:
             request.access_token.valid = False
             session.add(request.access_token)
+        access_token_cache.invalidate(request.access_token.token)
         # we explicitly construct the response as we delete the cookie
         response = jsonify({"message": self.t("success")})
         response.delete_cookie("access_token")
@@ -1,4 +1,5 @@
 from ....decorators.user import authorized
+from ....decorators.database import read_only
 from worf.settings import settings
 from worf.api.resource import Resource
 from ...forms.user import UserEditForm
@@ -47,6 +48,7 @@ class UserProfile(Resource):
         return profile
 
     @authorized()
+    @read_only
     def get(self):
         return self.profile(), 200
 
@@ -15,6 +15,7 @@ from .resources.user import (
 
 from .resources.block_email import BlockEMail
 from .resources.client_settings import ClientSettings
+from .resources.database import DatabasePool
 
 routes = [
     {"/login/<provider_name>": [Login, {"methods": ["POST"]}]},
@@ -51,4 +52,6 @@ routes = [
     {"/invitations/<invitation_id>": [Invitations, {"methods": ["GET", "DELETE"]}]},
     # settings
     {"/settings": [ClientSettings, {"methods": ["GET"]}]},
+    # database connection pool statistics (superusers only)
+    {"/database/pool": [DatabasePool, {"methods": ["GET"]}]},
 ]
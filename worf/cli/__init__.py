@@ -3,5 +3,6 @@ from .worker import worker
 from .db import db
 from .user import user
 from .tenant import tenant
+from .startup import startup_profile
 
-commands = [api, worker, db, user, tenant]
+commands = [api, worker, db, user, tenant, startup_profile]
@@ -1,5 +1,6 @@
 from worf.settings import settings
 from worf.cli import commands
+from worf.utils.lazy import resolve
 
 import click
 import os
@@ -30,7 +31,7 @@ def main():
         config = settings.load_plugin_config(plugin)
         if "commands" in config:
             for command in config["commands"]:
-                worf.add_command(command)
+                worf.add_command(resolve(command))
     worf()
 
 
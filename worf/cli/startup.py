@@ -0,0 +1,27 @@
+import subprocess
+import click
+import json
+import sys
+
+
+@click.command("startup-profile")
+@click.option("--app/--no-app", default=True, help="Also create the API app.")
+def startup_profile(app):
+    """
+    Report the import time of the settings and every plugin.
+    """
+    # we measure in a fresh interpreter, as everything is already imported here
+    args = [sys.executable, "-m", "worf.utils.startup"]
+    if not app:
+        args.append("--no-app")
+    result = subprocess.run(args, check=True, stdout=subprocess.PIPE, text=True)
+    timings = json.loads(result.stdout.splitlines()[-1])
+    total = sum(timing["seconds"] for timing in timings)
+    click.echo("{:<30} {:>10} {:>8}".format("step", "ms", "modules"))
+    for timing in timings:
+        click.echo(
+            "{:<30} {:>10.1f} {:>8}".format(
+                timing["step"], timing["seconds"] * 1000, timing["modules"]
+            )
+        )
+    click.echo("{:<30} {:>10.1f}".format("total", total * 1000))
@@ -28,7 +28,9 @@ class AccessToken(Base):
     default_expiration_minutes = Column(Integer, nullable=True)
     scopes = Column(Unicode, nullable=False)
     last_used_from = Column(Unicode, nullable=True)
-    token = Column(Unicode, nullable=False, default=lambda: uuid.uuid4().hex)
+    token = Column(
+        Unicode, nullable=False, unique=True, default=lambda: uuid.uuid4().hex
+    )
     valid = Column(Boolean, nullable=False, default=True)
     renews_when_used = Column(Boolean, nullable=False, default=True)
 
@@ -5,8 +5,11 @@ from sqlalchemy.sql import func
 from worf.settings import settings
 from sqlalchemy.dialects import sqlite, postgresql
 from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy import inspect
 import sqlalchemy.types as types
 import datetime
+import copy
 
 
 BigIntegerType = BigInteger()
@@ -59,3 +62,26 @@ class Base(DeclarativeBase):  # type: ignore
         if self.data is None:
             return None
         return self.data.get(key)
+
+    def snapshot(self):
+        """
+        Returns a copy of the column values of this object, which can be
+        cached and turned into a detached object again via `from_snapshot`.
+        """
+        return copy.deepcopy(
+            {
+                attr.key: getattr(self, attr.key)
+                for attr in inspect(self).mapper.column_attrs
+            }
+        )
+
+    @classmethod
+    def from_snapshot(cls, values):
+        """
+        Creates a detached object from a snapshot without querying the
+        database. It can be attached to a session via `session.merge(obj,
+        load=False)`.
+        """
+        obj = cls(**copy.deepcopy(values))
+        make_transient_to_detached(obj)
+        return obj
@@ -0,0 +1,8 @@
+UPDATE worf_version SET version = 5;
+
+DROP INDEX ix_access_token_token;
+CREATE INDEX ix_access_token_token ON access_token USING btree (token);
+
+CREATE INDEX ix_access_token_default_expiration_minutes ON access_token USING btree (default_expiration_minutes);
+CREATE INDEX ix_access_token_last_used_at ON access_token USING btree (last_used_at);
+CREATE INDEX ix_access_token_scopes ON access_token USING btree (scopes);
@@ -0,0 +1,11 @@
+UPDATE worf_version SET version = 6;
+
+-- tokens are looked up on every request, so we make the index unique
+DROP INDEX ix_access_token_token;
+CREATE UNIQUE INDEX ix_access_token_token ON access_token USING btree (token);
+
+-- these indexes are never used for lookups but need to be rewritten
+-- whenever a token is used
+DROP INDEX ix_access_token_default_expiration_minutes;
+DROP INDEX ix_access_token_last_used_at;
+DROP INDEX ix_access_token_scopes;
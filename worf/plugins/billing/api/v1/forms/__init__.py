@@ -1 +1,2 @@
 from .customer import CustomerForm
+from .invoice import InvoicesForm
@@ -0,0 +1,8 @@
+from worf.utils.forms import Form, Field, Optional
+
+from worf.utils.forms.validators import String, Integer, Length
+
+
+class InvoicesForm(Form):
+    limit = Field([Optional(), Integer(convert=True, min=1, max=1000)])
+    cursor = Field([Optional(), String(), Length(max=1000)])
@@ -1,12 +1,15 @@
 from flask import request
 
 from worf.api.resource import Resource
+from worf.api.pagination import paginate, InvalidCursor
 from worf.settings import settings
 from ....models import Invoice, Subscription, Customer
+from ..forms import InvoicesForm
 
 from sqlalchemy.orm import joinedload
 
 from worf.api.decorators.user import authorized
+from worf.api.decorators.database import read_only
 from worf.api.decorators.uuid import valid_uuid
 from worf.plugins.organizations.api.v1.decorators import organization_role
 
@@ -18,12 +21,24 @@ class Invoices(Resource):
     """
 
     @authorized(scopes=("admin",))
+    @read_only
     @valid_uuid(field="organization_id")
     @organization_role(roles=("superuser", "admin"))
     def get(self, organization_id):
         """
-        Return all invoices belonging to the organization.
+        Return the invoices belonging to the organization, newest first.
+
+        If a `limit` or `cursor` is given, the invoices are returned in pages,
+        the `next_cursor` value can be used to retrieve the next page. Clients
+        can also request all invoices as a stream of newline-delimited JSON.
         """
+        form = InvoicesForm(request.args)
+        if not form.validate():
+            return {"message": "invalid data", "errors": form.errors}, 400
+
+        limit = form.valid_data["limit"]
+        cursor = form.valid_data["cursor"]
+
         with settings.session() as session:
             invoices = (
                 session.query(Invoice)
@@ -38,6 +53,37 @@ class Invoices(Resource):
                     Customer.organization_id
                     == request.organization_role.organization_id
                 )
-                .all()
             )
-        return ({"data": [invoice.export() for invoice in invoices]}, 200)
+            if self.wants_stream():
+                return self.stream(
+                    invoices.order_by(Invoice.date.desc(), Invoice.id.desc()),
+                    lambda invoice: invoice.export(),
+                )
+            if limit is None and cursor is None:
+                invoices = invoices.order_by(Invoice.date.desc(), Invoice.id.desc())
+                invoices, has_more, next_cursor = invoices.all(), False, None
+            else:
+                try:
+                    invoices, has_more, next_cursor = paginate(
+                        invoices,
+                        (Invoice.date, Invoice.id),
+                        limit or 100,
+                        cursor=cursor,
+                        descending=True,
+                    )
+                except InvalidCursor:
+                    return (
+                        {
+                            "message": "invalid data",
+                            "errors": {"cursor": ["invalid cursor"]},
+                        },
+                        400,
+                    )
+        return (
+            {
+                "data": [invoice.export() for invoice in invoices],
+                "has_more": has_more,
+                "next_cursor": next_cursor,
+            },
+            200,
+        )
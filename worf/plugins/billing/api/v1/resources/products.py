@@ -8,6 +8,7 @@ from ..forms.products import ProductsForm
 from sqlalchemy.orm import joinedload
 
 from worf.api.decorators.user import authorized
+from worf.api.decorators.database import read_only
 
 
 class Products(Resource):
@@ -17,6 +18,7 @@ class Products(Resource):
     """
 
     @authorized(scopes=("admin",))
+    @read_only
     def get(self):
         """
         Return all products.
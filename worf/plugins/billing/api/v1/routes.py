@@ -10,6 +10,7 @@ from .resources import (
 )
 
 from .resources.admin import Sync
+from ...providers import provider_routes
 
 routes = [
     {"/admin/sync": (Sync, {"methods": ["POST"]})},
@@ -45,3 +46,6 @@ routes = [
     {"/products": (Products, {"methods": ["GET"]})},
     {"/tax_rates": (TaxRates, {"methods": ["GET"]})},
 ]
+
+# we add all provider API routes
+api_routes = routes + provider_routes()
@@ -23,6 +23,7 @@ from .helpers import get_provider
 from .providers import providers
 import datetime
 import logging
+import json
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +72,12 @@ def _process_events(all, type, since):
             datetime.timezone.utc
         )
     process_events(all=all, type=type, since=since)
+    for provider_name in providers:
+        metrics = get_provider(provider_name).event_metrics()
+        for event_type, m in sorted(metrics.items()):
+            click.echo(
+                f"{provider_name} {event_type}: {m['events']} events ({m['deferred']} deferred, {m['errors']} errors), {m['mean_seconds']:.3f} s mean, {m['max_seconds']:.3f} s max"
+            )
 
 
 @billing.command("run-maintenance")
@@ -90,6 +97,29 @@ def process_event(event_id):
     process_events(event_id)
 
 
+@events.command("import")
+@click.argument("filename", type=click.Path(exists=True))
+@click.option("--batch-size", default=500)
+def import_events(filename, batch_size):
+    """
+    Import Stripe events from a file (e.g. to replay missed webhooks). The file
+    contains one JSON-encoded event per line, or a JSON list of events.
+    """
+    from .providers.stripe.tasks import ingest_events
+
+    with open(filename) as input_file:
+        content = input_file.read()
+    if content.lstrip().startswith("["):
+        data = json.loads(content)
+    else:
+        data = [json.loads(line) for line in content.splitlines() if line.strip()]
+    imported = 0
+    for i in range(0, len(data), batch_size):
+        with settings.session() as session:
+            imported += len(ingest_events(session, data[i : i + batch_size]))
+    click.echo(f"Imported {imported} new events ({len(data) - imported} known).")
+
+
 @billing.group("invoices")
 def invoices():
     """
@@ -0,0 +1,157 @@
+from worf.plugins.billing.models import Event
+from worf.settings import settings
+from worf.api.pagination import after as keyset_after
+from concurrent.futures import ThreadPoolExecutor
+from .helpers import get_provider
+import threading
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventProcessor:
+
+    """
+    Processes billing events concurrently.
+
+    Events are loaded in batches of at most `batch_size` events in timestamp
+    order and split into partitions by the partition key their provider
+    assigns to them (e.g. the Stripe customer an event belongs to). The
+    partitions of a batch are processed concurrently by up to `workers`
+    threads, the events within a partition one after the other, so events
+    concerning the same object are still processed in order. The next batch
+    is loaded once all partitions of the current one are done. If an event
+    fails or is deferred, the following events of its partition are skipped
+    until the next run.
+
+    Events are claimed (see `Event.claim`) when they are loaded, so several
+    processors can run at the same time. A partition is only processed by one
+    processor at a time, the others skip its events until their next run.
+    Claims of events that could not be processed expire after
+    `lease_seconds` seconds.
+    """
+
+    def __init__(self, workers=4, batch_size=500, lease_seconds=600):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.owner = uuid.uuid4().hex
+        self.providers = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            workers=settings.get("billing.events.workers", 4),
+            batch_size=settings.get("billing.events.batch_size", 500),
+            lease_seconds=settings.get("billing.events.lease_seconds", 600),
+        )
+
+    def get_provider(self, provider_name):
+        with self.lock:
+            if not provider_name in self.providers:
+                self.providers[provider_name] = get_provider(provider_name)
+            return self.providers[provider_name]
+
+    def partition_key(self, event):
+        return self.get_provider(event.provider).partition_key(event)
+
+    def claim_batch(self, filters, skipped, after=None):
+        if after is not None:
+            filters = filters + [keyset_after([Event.timestamp, Event.id], after)]
+        with settings.session() as session:
+            events = Event.claim(
+                session,
+                filters,
+                self.batch_size,
+                self.owner,
+                self.lease_seconds,
+                partition_key=self.partition_key,
+                skipped=skipped,
+            )
+            # the events are processed in sessions of the worker threads
+            session.expunge_all()
+        return events
+
+    def partition(self, events):
+        partitions = {}
+        for event in events:
+            key = (event.provider, event.partition_key)
+            partitions.setdefault(key, []).append(event)
+        return list(partitions.values())
+
+    def process_partition(self, events, skipped):
+        partition = (events[0].provider, events[0].partition_key)
+        for i, event in enumerate(events):
+            # the event might be expired after a failed transaction
+            event_id, ext_id = event.id, event.ext_id
+            logger.info(
+                f"Processing event '{event.ext_id.hex}' of type '{event.type}' and timestamp {event.timestamp} (provider: {event.provider}, status: {event.status})"
+            )
+            try:
+                self.get_provider(event.provider).process_event(event)
+                with settings.session() as session:
+                    event.release(session, self.owner)
+            except:
+                logger.exception(f"Cannot process event '{ext_id.hex}'")
+                self.retry_event(event_id)
+                self.skip_partition(partition, events[i + 1 :], skipped)
+                return i + 1
+            if event.status in ("deferred", "failed", "dead"):
+                self.skip_partition(partition, events[i + 1 :], skipped)
+                return i + 1
+        return len(events)
+
+    def retry_event(self, event_id):
+        """
+        Defers an event whose processing raised an exception and releases
+        our claim on it, so it doesn't block its partition until the claim
+        expires.
+        """
+        with settings.session() as session:
+            event = session.get(Event, event_id)
+            event.defer(**settings.get("billing.events.retry", {}))
+            event.release(session, self.owner)
+
+    def skip_partition(self, partition, events, skipped):
+        """
+        Skips the rest of a partition in this run, as its remaining events
+        might depend on an event that couldn't be processed. The claims on
+        the remaining events of the batch are released.
+        """
+        skipped.add(partition)
+        if not events:
+            return
+        with settings.session() as session:
+            for event in events:
+                event.release(session, self.owner)
+
+    def process(self, filters):
+        """
+        Processes all events matching the given filters and returns their
+        number.
+        """
+        processed = 0
+        after = None
+        # the partitions that other processors are working on or that were
+        # stopped by an event that couldn't be processed
+        skipped = set()
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="billing-events"
+        ) as executor:
+            while True:
+                events = self.claim_batch(filters, skipped, after)
+                if not events:
+                    break
+                partitions = self.partition(events)
+                logger.info(
+                    f"Processing {len(events)} events in {len(partitions)} partitions..."
+                )
+                for future in [
+                    executor.submit(self.process_partition, partition, skipped)
+                    for partition in partitions
+                ]:
+                    processed += future.result()
+                after = (events[-1].timestamp, events[-1].id)
+        return processed
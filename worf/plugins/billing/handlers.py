@@ -0,0 +1,93 @@
+from worf.settings import settings
+from worf.utils.lazy import resolve
+
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EventHandlers:
+
+    """
+    Maps the event types of a provider to the functions that process them.
+
+    Handlers are registered with the `register` decorator. Other plugins can
+    add (or replace) handlers via the `billing.<provider>.event_handlers`
+    provider, which maps event types to functions (or `Lazy` references).
+
+    A handler receives the session and the event and returns a true value if
+    the event can't be processed yet. The number of calls, deferrals and
+    errors as well as the time spent are counted per event type.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.handlers = {}
+        self.lock = threading.Lock()
+        self.plugin_handlers = None
+        self.metrics = {}
+
+    def register(self, event_type):
+        def decorator(f):
+            self.handlers[event_type] = f
+            return f
+
+        return decorator
+
+    def get_plugin_handlers(self):
+        plugin_handlers = self.plugin_handlers
+        if plugin_handlers is None:
+            plugin_handlers = {}
+            name = "billing.{}.event_handlers".format(self.provider)
+            for handlers in settings.providers.get(name, []):
+                for event_type, f in resolve(handlers).items():
+                    plugin_handlers[event_type] = resolve(f)
+            self.plugin_handlers = plugin_handlers
+        return plugin_handlers
+
+    def get(self, event_type):
+        handler = self.get_plugin_handlers().get(event_type)
+        if handler is None:
+            handler = self.handlers.get(event_type)
+        return handler
+
+    def handle(self, handler, session, event):
+        start = time.perf_counter()
+        deferred = False
+        error = False
+        try:
+            deferred = bool(handler(session, event))
+            return deferred
+        except:
+            error = True
+            raise
+        finally:
+            self.record(event.type, time.perf_counter() - start, deferred, error)
+
+    def record(self, event_type, seconds, deferred=False, error=False):
+        with self.lock:
+            metrics = self.metrics.get(event_type)
+            if metrics is None:
+                metrics = self.metrics[event_type] = {
+                    "events": 0,
+                    "deferred": 0,
+                    "errors": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                }
+            metrics["events"] += 1
+            metrics["deferred"] += deferred
+            metrics["errors"] += error
+            metrics["seconds"] += seconds
+            metrics["max_seconds"] = max(metrics["max_seconds"], seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                event_type: dict(
+                    metrics, mean_seconds=metrics["seconds"] / metrics["events"]
+                )
+                for event_type, metrics in self.metrics.items()
+            }
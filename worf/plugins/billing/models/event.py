@@ -1,9 +1,28 @@
 from worf.models.base import Base, PkType
-from sqlalchemy import Column, Unicode, DateTime
+from sqlalchemy import Column, Unicode, DateTime, Integer, update, select, func
+from sqlalchemy.sql import or_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy_utils import JSONType
 
 from sqlalchemy.orm import relationship, backref
 
+import datetime
+import hashlib
+import random
+
+
+def utcnow():
+    return func.timezone("utc", func.now())
+
+
+def partition_lock_id(provider, key):
+    """
+    Returns the ID of the advisory lock of the given partition.
+    """
+    digest = hashlib.blake2b(f"{provider}:{key}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
 
 class Event(Base):
 
@@ -16,6 +35,197 @@ class Event(Base):
     def export(self):
         return {"id": str(self.ext_id)}
 
+    @classmethod
+    def ingest(cls, session, events):
+        """
+        Inserts the given events (dictionaries of column values) in bulk and
+        returns the IDs of the inserted ones. Events that already exist (with
+        the same provider and provider ID) are skipped.
+        """
+        if not events:
+            return []
+        stmt = (
+            insert(cls.__table__)
+            .on_conflict_do_nothing(index_elements=["provider", "provider_id"])
+            .returning(cls.__table__.c.id)
+        )
+        return list(session.scalars(stmt, events))
+
+    @classmethod
+    def due(cls):
+        """
+        Returns the filters that select the events which need to be processed
+        now: new events, deferred events whose next attempt is due and events
+        whose processing was interrupted.
+        """
+        return [
+            cls.status.in_(["unprocessed", "deferred", "processing"]),
+            or_(cls.next_attempt_at.is_(None), cls.next_attempt_at <= utcnow()),
+        ]
+
+    @classmethod
+    def claim(
+        cls,
+        session,
+        filters,
+        limit,
+        owner,
+        lease_seconds=600,
+        partition_key=None,
+        skipped=None,
+    ):
+        """
+        Claims up to `limit` events matching the given filters (in timestamp
+        order) for the given owner by marking them as "processing" for
+        `lease_seconds` seconds. Events claimed by others are skipped, unless
+        their lease expired (e.g. because the owner crashed).
+
+        If `partition_key` (a function that returns the partition key of an
+        event) is given, events of partitions that another owner is
+        processing are skipped too, so the events of a partition are never
+        processed by two owners at the same time. The skipped partitions
+        (pairs of provider and key) are added to the set `skipped`, events of
+        partitions already in it are skipped as well.
+
+        The returned events keep the status they had before they were claimed.
+        The claim takes effect when the session is committed.
+        """
+        if skipped is None:
+            skipped = set()
+        while True:
+            query = session.query(cls).filter(*filters)
+            if skipped:
+                query = query.filter(
+                    or_(
+                        cls.partition_key.is_(None),
+                        ~tuple_(cls.provider, cls.partition_key).in_(skipped),
+                    )
+                )
+            events = (
+                query.filter(
+                    or_(
+                        cls.status != "processing",
+                        cls.lease_expires_at.is_(None),
+                        cls.lease_expires_at < utcnow(),
+                    )
+                )
+                .order_by(cls.timestamp.asc(), cls.id.asc())
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if partition_key is None or not events:
+                break
+            for event in events:
+                if event.partition_key is None:
+                    event.partition_key = partition_key(event) or ""
+            session.flush()
+            partitions = {(event.provider, event.partition_key) for event in events}
+            skipped.update(cls.busy_partitions(session, partitions - skipped, owner))
+            events = [
+                event
+                for event in events
+                if (event.provider, event.partition_key) not in skipped
+            ]
+            # if all events were skipped, we look for more (the query skips
+            # them now that their partition keys are known)
+            if events:
+                break
+        if not events:
+            return events
+        session.execute(
+            update(cls)
+            .where(cls.id.in_([event.id for event in events]))
+            .values(
+                status="processing",
+                lease_owner=owner,
+                lease_expires_at=utcnow() + datetime.timedelta(seconds=lease_seconds),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        for event in events:
+            if event.status == "processing":
+                # the lease of this event was abandoned
+                set_committed_value(event, "status", "unprocessed")
+        return events
+
+    @classmethod
+    def busy_partitions(cls, session, partitions, owner):
+        """
+        Returns those of the given partitions (pairs of provider and key) that
+        another owner is processing, i.e. that contain events with an active
+        lease of another owner or that another owner is claiming right now.
+        The other partitions stay locked until the session is committed, so
+        no one else can claim their events in the meantime.
+        """
+        partitions = list(partitions)
+        if not partitions:
+            return set()
+        locked = []
+        # a statement can't have arbitrarily many columns
+        for i in range(0, len(partitions), 500):
+            locked.extend(
+                session.execute(
+                    select(
+                        *[
+                            func.pg_try_advisory_xact_lock(
+                                partition_lock_id(*partition)
+                            )
+                            for partition in partitions[i : i + 500]
+                        ]
+                    )
+                ).one()
+            )
+        busy = {
+            partition
+            for partition, is_locked in zip(partitions, locked)
+            if not is_locked
+        }
+        free = [partition for partition in partitions if partition not in busy]
+        if free:
+            # other owners committed their claims before they released the lock
+            busy.update(
+                tuple(row)
+                for row in session.query(cls.provider, cls.partition_key)
+                .filter(
+                    tuple_(cls.provider, cls.partition_key).in_(free),
+                    cls.status == "processing",
+                    cls.lease_owner != owner,
+                    cls.lease_expires_at >= utcnow(),
+                )
+                .distinct()
+            )
+        return busy
+
+    def defer(self, max_attempts=10, base_delay=5, max_delay=3600):
+        """
+        Schedules another attempt to process this event, the delay between
+        attempts doubles with every attempt (with some jitter). After
+        `max_attempts` attempts the event is given up on and marked as "dead".
+        """
+        self.attempts = (self.attempts or 0) + 1
+        if self.attempts >= max_attempts:
+            self.status = "dead"
+            self.next_attempt_at = None
+            return
+        delay = min(max_delay, base_delay * 2 ** (self.attempts - 1))
+        self.status = "deferred"
+        self.next_attempt_at = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=random.uniform(0.5, 1) * delay
+        )
+
+    def release(self, session, owner):
+        """
+        Releases the claim of the given owner on this event and stores its
+        current status.
+        """
+        session.execute(
+            update(Event)
+            .where(Event.id == self.id, Event.lease_owner == owner)
+            .values(status=self.status, lease_owner=None, lease_expires_at=None),
+            execution_options={"synchronize_session": False},
+        )
+
     # the provider that handles this customer, e.g. Stripe
     provider_data = Column(JSONType, index=False, nullable=True)
     # the ID of this object at the provider (if it exists)
@@ -28,3 +238,11 @@ class Event(Base):
     status = Column(Unicode, nullable=False, default="unprocessed")
     # the timestamp of the event
     timestamp = Column(DateTime)
+    # the key of the partition the event is processed in (see `EventProcessor`)
+    partition_key = Column(Unicode, nullable=True)
+    # the processor that claimed this event and until when
+    lease_owner = Column(Unicode, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    # the number of deferred attempts to process this event and when to retry
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=True)
@@ -0,0 +1,9 @@
+UPDATE worf_billing_version SET version = 5;
+
+DROP INDEX ix_billing_event_provider_provider_id;
+DROP INDEX ix_billing_event_status_timestamp;
+CREATE INDEX ix_billing_event_status ON billing_event USING btree (status);
+
+UPDATE billing_event SET status = 'unprocessed' WHERE status = 'processing';
+ALTER TABLE billing_event DROP COLUMN lease_expires_at;
+ALTER TABLE billing_event DROP COLUMN lease_owner;
@@ -0,0 +1,12 @@
+UPDATE worf_billing_version SET version = 6;
+
+-- events are claimed by a processor for a limited time (a lease), so
+-- several processors can process events concurrently
+ALTER TABLE billing_event ADD COLUMN lease_owner character varying;
+ALTER TABLE billing_event ADD COLUMN lease_expires_at timestamp without time zone;
+
+-- pending events are claimed by status in timestamp order, webhooks look up
+-- events by their provider ID
+DROP INDEX ix_billing_event_status;
+CREATE INDEX ix_billing_event_status_timestamp ON billing_event USING btree (status, timestamp);
+CREATE INDEX ix_billing_event_provider_provider_id ON billing_event USING btree (provider, provider_id);
@@ -0,0 +1,7 @@
+UPDATE worf_billing_version SET version = 6;
+
+DROP INDEX ix_billing_event_status_next_attempt_at;
+
+UPDATE billing_event SET status = 'deferred' WHERE status = 'dead';
+ALTER TABLE billing_event DROP COLUMN next_attempt_at;
+ALTER TABLE billing_event DROP COLUMN attempts;
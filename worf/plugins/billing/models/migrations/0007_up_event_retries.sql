@@ -0,0 +1,7 @@
+UPDATE worf_billing_version SET version = 7;
+
+-- deferred events are retried with exponential backoff
+ALTER TABLE billing_event ADD COLUMN attempts integer NOT NULL DEFAULT 0;
+ALTER TABLE billing_event ADD COLUMN next_attempt_at timestamp without time zone;
+
+CREATE INDEX ix_billing_event_status_next_attempt_at ON billing_event USING btree (status, next_attempt_at);
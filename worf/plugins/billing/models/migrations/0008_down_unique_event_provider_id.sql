@@ -0,0 +1,4 @@
+UPDATE worf_billing_version SET version = 7;
+
+DROP INDEX ix_billing_event_provider_provider_id;
+CREATE INDEX ix_billing_event_provider_provider_id ON billing_event USING btree (provider, provider_id);
@@ -0,0 +1,8 @@
+UPDATE worf_billing_version SET version = 8;
+
+-- providers deliver events more than once, we keep only the first copy
+DELETE FROM billing_event a USING billing_event b
+    WHERE a.provider = b.provider AND a.provider_id = b.provider_id AND a.id > b.id;
+
+DROP INDEX ix_billing_event_provider_provider_id;
+CREATE UNIQUE INDEX ix_billing_event_provider_provider_id ON billing_event USING btree (provider, provider_id);
@@ -0,0 +1,4 @@
+UPDATE worf_billing_version SET version = 8;
+
+DROP INDEX ix_billing_event_processing_partition;
+ALTER TABLE billing_event DROP COLUMN partition_key;
@@ -0,0 +1,6 @@
+UPDATE worf_billing_version SET version = 9;
+
+-- the partition an event is processed in (e.g. the Stripe customer), so
+-- processors can find the partitions other processors are working on
+ALTER TABLE billing_event ADD COLUMN partition_key character varying;
+CREATE INDEX ix_billing_event_processing_partition ON billing_event USING btree (provider, partition_key) WHERE status = 'processing';
@@ -2,3 +2,26 @@ from .stripe import Stripe
 from .bank_transfer import BankTransfer
 
 providers = {"stripe": Stripe, "bank_transfer": BankTransfer}
+
+
+def client_settings():
+    provider_settings = {}
+    for provider_name, provider_class in providers.items():
+        provider = provider_class()
+        if hasattr(provider, "client_settings"):
+            provider_settings[provider_name] = provider.client_settings
+    provider_settings["providers"] = list(providers.keys())
+    return {"billing": provider_settings}
+
+
+def provider_routes():
+    """
+    Returns the API routes of all providers, prefixed with the provider name.
+    """
+    prefixed_routes = []
+    for provider_name, provider_class in providers.items():
+        provider = provider_class()
+        for route in provider.routes:
+            key, params = list(route.items())[0]
+            prefixed_routes.append({"/" + provider_name + key: params})
+    return prefixed_routes
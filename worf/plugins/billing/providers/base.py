@@ -8,3 +8,18 @@ class BaseProvider(abc.ABC):
 
     def run_maintenance_tasks(self):
         pass
+
+    def event_metrics(self):
+        """
+        Returns statistics about the processed events per event type.
+        """
+        return {}
+
+    def partition_key(self, event):
+        """
+        Returns the key of the partition an event belongs to. Events with the
+        same key are processed in order, events with different keys may be
+        processed concurrently. By default, all events of a provider belong
+        to the same partition.
+        """
+        return None
@@ -2,7 +2,7 @@ from flask import request
 
 from worf.api.resource import Resource
 from worf.settings import settings
-from ...tasks import process_hook
+from ...tasks import ingest_events, process_ingested_events
 import hmac, hashlib
 
 
@@ -49,6 +49,10 @@ class Hooks(Resource):
         else:
             # no signature matched
             return {"message": "missing or mismatched signature"}, 400
-        # we asynchronously process the hook data
-        settings.delay(process_hook, data=request.json)
+        # we store the event before acknowledging it, Stripe delivers events
+        # more than once, so we only process events we didn't see before
+        with settings.session() as session:
+            event_ids = ingest_events(session, [request.json])
+        if event_ids:
+            settings.delay(process_ingested_events, event_ids=event_ids)
         return ({}, 200)
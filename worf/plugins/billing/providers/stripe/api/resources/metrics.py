@@ -0,0 +1,16 @@
+from worf.api.resource import Resource
+from worf.api.decorators.user import authorized
+from ...client import get_metrics
+from ...tasks import handlers
+
+
+class Metrics(Resource):
+
+    """
+    Returns statistics about the Stripe API requests and the processed events
+    of the API process that handles the request (for superusers).
+    """
+
+    @authorized(superuser=True, scopes=("admin",))
+    def get(self):
+        return {"endpoints": get_metrics(), "events": handlers.snapshot()}, 200
@@ -1,6 +1,9 @@
 from .resources.hooks import Hooks
+from .resources.metrics import Metrics
 
 routes = [
     # Hooks
-    {"/hooks": (Hooks, {"methods": ["GET", "POST"]})}
+    {"/hooks": (Hooks, {"methods": ["GET", "POST"]})},
+    # Metrics
+    {"/metrics": (Metrics, {"methods": ["GET"]})},
 ]
@@ -1,33 +1,29 @@
-import requests
-from requests.auth import HTTPBasicAuth
+from .client import get_client
 
 
 class StripeService:
     def __init__(self, config):
         self.config = config
+        self.client = get_client(config)
 
     @property
     def base_url(self):
-        return self.config.get("url", "https://api.stripe.com")
+        return self.client.base_url
 
     def request(self, method, url, **kwargs):
-        return method(
-            f"{self.base_url}{url}",
-            auth=HTTPBasicAuth(self.config["private_key"], ""),
-            **kwargs,
-        )
+        return self.client.request(method, url, **kwargs)
 
     def get(self, url, **kwargs):
-        return self.request(requests.get, url, **kwargs)
+        return self.request("GET", url, **kwargs)
 
     def post(self, url, **kwargs):
-        return self.request(requests.post, url, **kwargs)
+        return self.request("POST", url, **kwargs)
 
     def patch(self, url, **kwargs):
-        return self.request(requests.patch, url, **kwargs)
+        return self.request("PATCH", url, **kwargs)
 
     def put(self, url, **kwargs):
-        return self.request(requests.put, url, **kwargs)
+        return self.request("PUT", url, **kwargs)
 
     def delete(self, url, **kwargs):
-        return self.request(requests.delete, url, **kwargs)
+        return self.request("DELETE", url, **kwargs)
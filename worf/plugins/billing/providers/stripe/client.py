@@ -0,0 +1,205 @@
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from typing import Dict
+
+import threading
+import requests
+import logging
+import random
+import time
+import uuid
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# path segments that contain Stripe object IDs, e.g. "cus_NffrFeUfNV2Hib" or
+# "cs_test_a1RxKq9tr7A0Ve6Ot0bwYpBq", but not names like "tax_rates"
+OBJECT_ID = re.compile(r"/[a-z]{2,6}_(?:test_|live_)?[A-Za-z0-9]{14,}(?=/|$)")
+
+
+def endpoint_name(method, url):
+    """
+    Returns the endpoint of a request for the metrics, with object IDs
+    replaced by a placeholder (e.g. "POST /v1/customers/{id}").
+    """
+    return "{} {}".format(method, OBJECT_ID.sub("/{id}", url.split("?", 1)[0]))
+
+
+class EndpointMetrics:
+
+    """
+    Collects the number of requests, retries and errors as well as the
+    latency of the requests per Stripe API endpoint.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, seconds, status=None, retries=0):
+        with self.lock:
+            metrics = self.endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self.endpoints[endpoint] = {
+                    "requests": 0,
+                    "retries": 0,
+                    "errors": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                }
+            metrics["requests"] += 1
+            metrics["retries"] += retries
+            metrics["seconds"] += seconds
+            metrics["max_seconds"] = max(metrics["max_seconds"], seconds)
+            if status is None or status >= 400:
+                metrics["errors"] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                endpoint: dict(
+                    metrics, mean_seconds=metrics["seconds"] / metrics["requests"]
+                )
+                for endpoint, metrics in self.endpoints.items()
+            }
+
+
+class StripeClient:
+
+    """
+    Sends requests to the Stripe API through a pooled session, so connections
+    are kept alive and reused between requests.
+
+    Requests that fail with a connection error, a 429 or a 5xx response are
+    retried up to `max_retries` times with jittered exponential backoff,
+    unless Stripe says that they shouldn't be. POST requests carry an
+    idempotency key that stays the same between retries, so retrying them
+    never creates objects twice.
+    """
+
+    def __init__(
+        self,
+        private_key,
+        base_url="https://api.stripe.com",
+        connect_timeout=5,
+        read_timeout=30,
+        max_retries=2,
+        backoff=0.5,
+        max_backoff=8,
+        pool_size=10,
+    ):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = EndpointMetrics()
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(private_key, "")
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config["private_key"],
+            base_url=config.get("url", "https://api.stripe.com"),
+            connect_timeout=config.get("connect_timeout", 5),
+            read_timeout=config.get("read_timeout", 30),
+            max_retries=config.get("max_retries", 2),
+            backoff=config.get("backoff", 0.5),
+            max_backoff=config.get("max_backoff", 8),
+            pool_size=config.get("pool_size", 10),
+        )
+
+    def should_retry(self, response):
+        should_retry = response.headers.get("Stripe-Should-Retry")
+        if should_retry is not None:
+            return should_retry == "true"
+        return response.status_code == 429 or response.status_code >= 500
+
+    def delay(self, attempt, response=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("Retry-After", 0)))
+            except ValueError:
+                pass
+        return delay
+
+    def request(self, method, url, idempotency_key=None, **kwargs):
+        method = method.upper()
+        kwargs.setdefault("timeout", self.timeout)
+        if method == "POST":
+            headers = kwargs["headers"] = dict(kwargs.get("headers") or {})
+            headers.setdefault("Idempotency-Key", idempotency_key or str(uuid.uuid4()))
+        endpoint = endpoint_name(method, url)
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(
+                    method, f"{self.base_url}{url}", **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    self.metrics.record(
+                        endpoint, time.monotonic() - start, retries=attempt
+                    )
+                    raise
+                response = None
+            else:
+                if attempt >= self.max_retries or not self.should_retry(response):
+                    break
+            delay = self.delay(attempt, response)
+            logger.warning(
+                "Retrying {} in {:.2f} seconds ({})...".format(
+                    endpoint,
+                    delay,
+                    response.status_code if response is not None else "no response",
+                )
+            )
+            time.sleep(delay)
+            attempt += 1
+        self.metrics.record(
+            endpoint, time.monotonic() - start, response.status_code, retries=attempt
+        )
+        return response
+
+
+clients: Dict[tuple, StripeClient] = {}
+clients_lock = threading.Lock()
+
+
+def get_client(config):
+    """
+    Returns the client of this process for the given Stripe configuration.
+    """
+    key = tuple(sorted((k, repr(v)) for k, v in config.items()))
+    with clients_lock:
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = StripeClient.from_config(config)
+        return client
+
+
+def get_metrics():
+    """
+    Returns the request metrics of all clients of this process.
+    """
+    with clients_lock:
+        metrics = [client.metrics.snapshot() for client in clients.values()]
+    return {k: v for m in metrics for k, v in m.items()}
+
+
+def reset_clients():
+    global clients_lock
+    # the lock might have been held by another thread during the fork
+    clients_lock = threading.Lock()
+    clients.clear()
+
+
+# forked processes (e.g. Celery workers) must not share pooled connections
+os.register_at_fork(after_in_child=reset_clients)
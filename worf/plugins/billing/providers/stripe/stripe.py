@@ -7,6 +7,7 @@ from .tax_rates import TaxRates
 from .setup_intents import SetupIntents
 from .payments import Payments
 from .payment_methods import PaymentMethods
+from .client import get_metrics
 from ..base import BaseProvider
 from ...models import (
     Product,
@@ -18,6 +19,9 @@ from ...models import (
 )
 
 from worf.settings import settings
+from worf.utils.settings import thaw
+
+from functools import cached_property
 
 import logging
 
@@ -52,39 +56,39 @@ class Stripe(BaseProvider):
             "payment_types": self.config.get("payment_types"),
         }
 
-    @property
+    @cached_property
     def payment_methods(self):
         return PaymentMethods(self.config)
 
-    @property
+    @cached_property
     def setup_intents(self):
         return SetupIntents(self.config)
 
-    @property
+    @cached_property
     def checkouts(self):
         return Checkouts(self.config)
 
-    @property
+    @cached_property
     def prices(self):
         return Prices(self.config)
 
-    @property
+    @cached_property
     def products(self):
         return Products(self.config)
 
-    @property
+    @cached_property
     def subscriptions(self):
         return Subscriptions(self.config)
 
-    @property
+    @cached_property
     def customers(self):
         return Customers(self.config)
 
-    @property
+    @cached_property
     def payments(self):
         return Payments(self.config)
 
-    @property
+    @cached_property
     def tax_rates(self):
         return TaxRates(self.config)
 
@@ -93,12 +97,46 @@ class Stripe(BaseProvider):
         self.sync_tax_rates()
         self.sync_customers()
         self.sync_subscriptions()
+        for endpoint, metrics in sorted(get_metrics().items()):
+            logger.info(
+                "{}: {} requests ({} retries, {} errors), {:.3f} s mean, {:.3f} s max".format(
+                    endpoint,
+                    metrics["requests"],
+                    metrics["retries"],
+                    metrics["errors"],
+                    metrics["mean_seconds"],
+                    metrics["max_seconds"],
+                )
+            )
 
     def process_event(self, event):
         from .tasks import process_event
 
         process_event(event)
 
+    def event_metrics(self):
+        from .tasks import handlers
+
+        return handlers.snapshot()
+
+    def partition_key(self, event):
+        """
+        Events are partitioned by the customer they concern, as all objects we
+        process (subscriptions, invoices, checkout sessions, ...) belong to a
+        customer. Events of other objects are partitioned by the object.
+        """
+        try:
+            obj = event.provider_data["data"]["object"]
+        except (KeyError, TypeError):
+            return None
+        if obj.get("object") == "customer":
+            return obj.get("id")
+        customer = obj.get("customer")
+        if isinstance(customer, dict):
+            # the customer might be expanded
+            customer = customer.get("id")
+        return customer or obj.get("id")
+
     def sync_subscriptions(self):
         """
         Subscriptions are synced only from Stripe to the local database.
@@ -116,7 +154,7 @@ class Stripe(BaseProvider):
         Synchronizes tax rates via the Stripe API
         """
         logger.info("Synchronizing tax rates...")
-        tax_rate_specs = settings.get("billing.tax_rates")
+        tax_rate_specs = thaw(settings.get("billing.tax_rates"))
         tax_rates = []
         for tax_rate_spec in tax_rate_specs:
             with settings.session() as session:
@@ -137,7 +175,7 @@ class Stripe(BaseProvider):
         Synchronizes products and prices via the Stripe API
         """
         logger.info("Synchronizing products...")
-        product_specs = settings.get("billing.products")
+        product_specs = thaw(settings.get("billing.products"))
         for product_spec in product_specs:
             with settings.session() as session:
                 product = Product.get_or_create(session, product_spec["name"])
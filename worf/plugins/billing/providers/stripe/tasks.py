@@ -17,6 +17,8 @@ from ...models import (
 from sqlalchemy.orm import joinedload
 from .stripe import Stripe
 from ...tasks import generate_invoice_pdf, send_invoice_by_email
+from ...events import EventProcessor
+from ...handlers import EventHandlers
 import traceback
 import requests
 import datetime
@@ -26,28 +28,22 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def get_processors():
-    prefix = "stripe_process_"
-    processors = {}
-    for function_name in globals():
-        if function_name.startswith(prefix):
-            processors[function_name[len(prefix) :].replace("_", ".")] = globals()[
-                function_name
-            ]
-    return processors
+# the handlers of the Stripe event types
+handlers = EventHandlers("stripe")
 
 
 def process_event(event):
-    processors = get_processors()
+    handler = handlers.get(event.type)
     with settings.session() as session:
         session.add(event)
-        if not event.type in processors:
+        if handler is None:
+            # there's nothing to do for this event type
+            logger.debug(f"No handler for Stripe events of type '{event.type}'")
+            event.status = "ignored"
             return
-        processor = processors[event.type]
         try:
-            status = processor(session, event)
-            if status:
-                event.status = "deferred"
+            if handlers.handle(handler, session, event):
+                event.defer(**settings.get("billing.events.retry", {}))
             else:
                 event.status = "processed"
         except:
@@ -56,28 +52,52 @@ def process_event(event):
             logger.error(traceback.format_exc())
 
 
+def event_values(data):
+    """
+    Returns the column values of the event for the given Stripe event data.
+    """
+    return {
+        "provider": "stripe",
+        "provider_id": data["id"],
+        "provider_data": data,
+        "status": "unprocessed",
+        "type": data["type"],
+        "timestamp": datetime.datetime.fromtimestamp(data["created"]).astimezone(
+            datetime.timezone.utc
+        ),
+    }
+
+
+def ingest_events(session, events):
+    """
+    Stores the given Stripe events (e.g. replayed from an export) and returns
+    the IDs of the new ones, events that were stored before are skipped.
+    """
+    return Event.ingest(session, [event_values(data) for data in events])
+
+
+@settings.register_task
+def process_ingested_events(event_ids):
+    # events might have been processed by `process_due_events` in the meantime
+    EventProcessor.from_settings(settings).process(
+        [Event.id.in_(event_ids), *Event.due()]
+    )
+
+
 @settings.register_task
 def process_hook(data):
     with settings.session() as session:
-        dt = datetime.datetime.fromtimestamp(data["created"]).astimezone(
-            datetime.timezone.utc
-        )
-        event = Event(
-            provider="stripe",
-            provider_id=data["id"],
-            provider_data=data,
-            status="unprocessed",
-            type=data["type"],
-            timestamp=dt,
-        )
-        session.add(event)
-    process_event(event)
+        event_ids = ingest_events(session, [data])
+    if event_ids:
+        process_ingested_events(event_ids)
 
 
+@handlers.register("customer.subscription.created")
 def stripe_process_customer_subscription_created(session, event):
     return create_or_update_subscription(session, event)
 
 
+@handlers.register("customer.subscription.updated")
 def stripe_process_customer_subscription_updated(session, event):
     return create_or_update_subscription(session, event)
 
@@ -163,6 +183,7 @@ def create_or_update_subscription(session, event):
             logger.info("Created a subscription item provider for ID {item['id']}")
 
 
+@handlers.register("invoice.finalized")
 def stripe_process_invoice_finalized(session, event):
     """
     Get subscription for invoice
@@ -312,6 +333,7 @@ def stripe_process_invoice_finalized(session, event):
             send_invoice_by_email(session, invoice)
 
 
+@handlers.register("customer.updated")
 def stripe_process_customer_updated(session, event):
     provider = Stripe()
     data = event.provider_data
@@ -330,6 +352,7 @@ def stripe_process_customer_updated(session, event):
     customer_provider.provider_data = customer
 
 
+@handlers.register("checkout.session.completed")
 def stripe_process_checkout_session_completed(session, event):
     provider = Stripe()
     data = event.provider_data
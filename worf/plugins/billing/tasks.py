@@ -3,8 +3,8 @@ from worf.plugins.billing.models import Event
 from worf.settings import settings
 from worf.utils.email import jinja_email, send_email
 from worf.utils.pdf import pdf
-from sqlalchemy.sql import asc
 from .helpers import get_provider
+from .events import EventProcessor
 from .providers import providers
 import traceback
 import logging
@@ -27,32 +27,29 @@ def run_maintenance_tasks():
 
 @settings.register_task
 def process_events(event_id=None, all=False, type=None, since=None):
-    providers = {}
-    with settings.session() as session:
-        if not all:
-            extra_filters = [~Event.status.in_(["processed", "failed"])]
-        else:
-            extra_filters = []
-        if event_id is not None:
-            extra_filters = [Event.ext_id == event_id]
-        if type:
-            extra_filters.append(Event.type == type)
-        if since:
-            extra_filters.append(Event.timestamp > since)
-        events = (
-            session.query(Event)
-            .filter(*extra_filters)
-            .order_by(asc(Event.timestamp))
-            .all()
-        )
-        for event in events:
-            logger.info(
-                f"Processing event '{event.ext_id.hex}' of type '{event.type}' and timestamp {event.timestamp} (provider: {event.provider}, status: {event.status})"
-            )
-            pn = event.provider
-            if not pn in providers:
-                providers[pn] = get_provider(pn)
-            providers[pn].process_event(event)
+    if not all:
+        extra_filters = Event.due()
+    else:
+        extra_filters = []
+    if event_id is not None:
+        extra_filters = [Event.ext_id == event_id]
+    if type:
+        extra_filters.append(Event.type == type)
+    if since:
+        extra_filters.append(Event.timestamp > since)
+    processor = EventProcessor.from_settings(settings)
+    processor.process(extra_filters)
+
+
+@settings.register_task
+def process_due_events():
+    """
+    Processes new events and retries deferred events whose next attempt is
+    due. This runs frequently, so events that arrived out of order are
+    processed soon after the events they depend on.
+    """
+    processor = EventProcessor.from_settings(settings)
+    processor.process(Event.due())
 
 
 def send_invoice_by_email(session, invoice, email=None):
@@ -0,0 +1,343 @@
+from worf.tests.helpers import DatabaseTest
+from worf.plugins.billing.events import EventProcessor
+from worf.plugins.billing.models import Event
+from worf.plugins.billing.models.event import partition_lock_id
+from worf.settings import settings
+from worf.plugins.billing.providers.stripe import Stripe
+
+import threading
+from sqlalchemy import update, select, func
+
+import datetime
+
+
+class RecordingProvider:
+    def __init__(self, deferred=(), failing=()):
+        self.lock = threading.Lock()
+        self.processed = []
+        self.deferred = deferred
+        self.failing = failing
+
+    def partition_key(self, event):
+        return Stripe().partition_key(event)
+
+    def process_event(self, event):
+        with self.lock:
+            self.processed.append(event.provider_id)
+        if event.provider_id in self.deferred:
+            event.status = "deferred"
+        if event.provider_id in self.failing:
+            with settings.session() as session:
+                session.add(event)
+                raise ValueError("cannot process event")
+
+
+class TestEventProcessor(DatabaseTest):
+    def test_partitioned_processing(self):
+        start = datetime.datetime(2024, 1, 1)
+        for i in range(10):
+            customer = "cus_{}".format(i % 3)
+            self.session.add(
+                Event(
+                    provider="stripe",
+                    provider_id="evt_{}".format(i),
+                    provider_data={
+                        "data": {"object": {"object": "invoice", "customer": customer}}
+                    },
+                    type="invoice.finalized",
+                    status="unprocessed",
+                    timestamp=start + datetime.timedelta(seconds=i),
+                )
+            )
+        self.session.commit()
+
+        provider = RecordingProvider()
+        processor = EventProcessor(workers=3, batch_size=4)
+        processor.providers["stripe"] = provider
+        assert processor.process([Event.status == "unprocessed"]) == 10
+        assert sorted(provider.processed) == sorted(
+            "evt_{}".format(i) for i in range(10)
+        )
+
+        # events of the same customer are processed in order
+        for c in range(3):
+            events = ["evt_{}".format(i) for i in range(10) if i % 3 == c]
+            assert [e for e in provider.processed if e in events] == events
+
+    def test_stopped_partitions(self):
+        start = datetime.datetime(2024, 1, 1)
+        for i, customer in enumerate(["cus_1", "cus_1", "cus_1", "cus_1", "cus_2"]):
+            self.session.add(
+                Event(
+                    provider="stripe",
+                    provider_id="evt_{}".format(i),
+                    provider_data={"data": {"object": {"customer": customer}}},
+                    type="invoice.finalized",
+                    status="unprocessed",
+                    timestamp=start + datetime.timedelta(seconds=i),
+                )
+            )
+        self.session.commit()
+
+        provider = RecordingProvider(deferred={"evt_1"})
+        processor = EventProcessor(workers=2, batch_size=2)
+        processor.providers["stripe"] = provider
+        assert processor.process([Event.status == "unprocessed"]) == 3
+        # the later events of the first customer (in this and later batches)
+        # wait for the deferred one
+        assert provider.processed == ["evt_0", "evt_1", "evt_4"]
+
+        self.session.expire_all()
+        for event in self.session.query(Event):
+            assert event.lease_owner is None
+            assert event.status == (
+                "deferred" if event.provider_id == "evt_1" else "unprocessed"
+            )
+
+    def test_failing_events(self):
+        for i in range(2):
+            self.session.add(
+                Event(
+                    provider="stripe",
+                    provider_id="evt_{}".format(i),
+                    provider_data={"data": {"object": {"customer": "cus_1"}}},
+                    type="invoice.finalized",
+                    status="unprocessed",
+                    timestamp=datetime.datetime(2024, 1, 1, 0, 0, i),
+                )
+            )
+        self.session.commit()
+
+        provider = RecordingProvider(failing={"evt_0"})
+        processor = EventProcessor(workers=1)
+        processor.providers["stripe"] = provider
+        assert processor.process(Event.due()) == 1
+        assert provider.processed == ["evt_0"]
+
+        self.session.expire_all()
+        events = {event.provider_id: event for event in self.session.query(Event)}
+        # the failing event is retried later and doesn't keep its claim
+        assert events["evt_0"].lease_owner is None
+        assert events["evt_0"].status == "deferred"
+        assert events["evt_0"].attempts == 1
+        assert events["evt_1"].lease_owner is None
+        assert events["evt_1"].status == "unprocessed"
+
+    def test_partition_key(self):
+        event = Event(
+            provider="stripe",
+            provider_data={"data": {"object": {"object": "customer", "id": "cus_1"}}},
+        )
+        assert Stripe().partition_key(event) == "cus_1"
+        event.provider_data = {"data": {"object": {"id": "sub_1", "customer": "cus_2"}}}
+        assert Stripe().partition_key(event) == "cus_2"
+
+    def test_claims(self):
+        for i in range(3):
+            self.session.add(
+                Event(
+                    provider="stripe",
+                    provider_id="evt_{}".format(i),
+                    type="invoice.finalized",
+                    status="unprocessed",
+                    timestamp=datetime.datetime(2024, 1, 1, 0, 0, i),
+                )
+            )
+        self.session.commit()
+        pending = [~Event.status.in_(["processed", "failed"])]
+
+        events = Event.claim(self.session, pending, 2, "a")
+        self.session.commit()
+        assert [event.provider_id for event in events] == ["evt_0", "evt_1"]
+        # the claimed events keep their status
+        assert events[0].status == "unprocessed"
+
+        # claimed events are skipped by other processors
+        events = Event.claim(self.session, pending, 10, "b")
+        self.session.commit()
+        assert [event.provider_id for event in events] == ["evt_2"]
+        assert Event.claim(self.session, pending, 10, "c") == []
+
+        # the lease of "a" expires, so its remaining events can be reclaimed
+        self.session.expire_all()
+        event = self.session.query(Event).filter(Event.provider_id == "evt_0").one()
+        event.status = "processed"
+        event.release(self.session, "a")
+        self.session.execute(
+            update(Event)
+            .where(Event.lease_owner == "a")
+            .values(lease_expires_at=datetime.datetime(2000, 1, 1))
+        )
+        self.session.commit()
+        events = Event.claim(self.session, pending, 10, "c")
+        self.session.commit()
+        assert [event.provider_id for event in events] == ["evt_1"]
+        assert events[0].status == "unprocessed"
+
+    def test_busy_partitions(self):
+        start = datetime.datetime(2024, 1, 1)
+        for i, (customer, status) in enumerate(
+            [
+                ("cus_1", "processing"),
+                ("cus_1", "unprocessed"),
+                ("cus_2", "unprocessed"),
+                ("cus_3", "unprocessed"),
+            ]
+        ):
+            self.session.add(
+                Event(
+                    provider="stripe",
+                    provider_id="evt_{}".format(i),
+                    provider_data={"data": {"object": {"customer": customer}}},
+                    type="invoice.finalized",
+                    status=status,
+                    timestamp=start + datetime.timedelta(seconds=i),
+                )
+            )
+        self.session.commit()
+        # another processor works on the events of the first customer...
+        self.session.execute(
+            update(Event)
+            .where(Event.provider_id == "evt_0")
+            .values(
+                lease_owner="other",
+                lease_expires_at=datetime.datetime.utcnow()
+                + datetime.timedelta(minutes=10),
+                partition_key="cus_1",
+            )
+        )
+        self.session.commit()
+
+        provider = RecordingProvider()
+        processor = EventProcessor(workers=2, batch_size=1)
+        processor.providers["stripe"] = provider
+        # ...and is claiming the events of the third one right now
+        engine = settings.get_db_engine()
+        try:
+            with engine.connect() as connection:
+                with connection.begin():
+                    lock_id = partition_lock_id("stripe", "cus_3")
+                    connection.execute(select(func.pg_advisory_xact_lock(lock_id)))
+                    assert processor.process([Event.status == "unprocessed"]) == 1
+        finally:
+            engine.dispose()
+        assert provider.processed == ["evt_2"]
+
+        self.session.expire_all()
+        events = {event.provider_id: event for event in self.session.query(Event)}
+        assert events["evt_1"].status == "unprocessed"
+        assert events["evt_1"].lease_owner is None
+        assert events["evt_1"].partition_key == "cus_1"
+        assert events["evt_3"].status == "unprocessed"
+        assert events["evt_3"].lease_owner is None
+
+    def test_retries(self):
+        event = Event(
+            provider="stripe",
+            provider_id="evt_0",
+            type="invoice.finalized",
+            status="unprocessed",
+            timestamp=datetime.datetime(2024, 1, 1),
+        )
+        self.session.add(event)
+        self.session.commit()
+        assert self.session.query(Event).filter(*Event.due()).count() == 1
+
+        event.defer(max_attempts=3, base_delay=60)
+        self.session.commit()
+        assert event.status == "deferred"
+        assert event.attempts == 1
+        assert event.next_attempt_at > datetime.datetime.utcnow()
+        # the event isn't due before its next attempt
+        assert self.session.query(Event).filter(*Event.due()).count() == 0
+
+        event.next_attempt_at = datetime.datetime.utcnow()
+        self.session.commit()
+        assert self.session.query(Event).filter(*Event.due()).count() == 1
+
+        event.defer(max_attempts=3, base_delay=60)
+        event.defer(max_attempts=3, base_delay=60)
+        self.session.commit()
+        assert event.status == "dead"
+        assert self.session.query(Event).filter(*Event.due()).count() == 0
+
+    def test_unhandled_events(self):
+        self.session.add(
+            Event(
+                provider="stripe",
+                provider_id="evt_0",
+                provider_data={"data": {"object": {"customer": "cus_1"}}},
+                type="charge.refund.updated",
+                status="unprocessed",
+                timestamp=datetime.datetime(2024, 1, 1),
+            )
+        )
+        self.session.commit()
+        processor = EventProcessor(workers=1)
+        processor.providers["stripe"] = Stripe()
+        assert processor.process(Event.due()) == 1
+        self.session.expire_all()
+        event = self.session.query(Event).one()
+        assert event.status == "ignored"
+        assert event.lease_owner is None
+        # events without a handler aren't picked up again
+        assert self.session.query(Event).filter(*Event.due()).count() == 0
+
+    def test_process_ingested_events_once(self):
+        from worf.plugins.billing.providers.stripe.tasks import (
+            handlers,
+            ingest_events,
+            process_ingested_events,
+        )
+
+        calls = []
+
+        @handlers.register("test.event")
+        def handle_test_event(session, event):
+            calls.append(event.provider_id)
+
+        try:
+            event_ids = ingest_events(
+                self.session,
+                [
+                    {
+                        "id": "evt_1",
+                        "type": "test.event",
+                        "created": 1704067200,
+                        "data": {"object": {"customer": "cus_1"}},
+                    }
+                ],
+            )
+            self.session.commit()
+            process_ingested_events(event_ids)
+            # e.g. the webhook task runs after `process_due_events`
+            process_ingested_events(event_ids)
+        finally:
+            del handlers.handlers["test.event"]
+        assert calls == ["evt_1"]
+        self.session.expire_all()
+        assert self.session.query(Event).one().status == "processed"
+
+    def test_ingest(self):
+        from worf.plugins.billing.providers.stripe.tasks import ingest_events
+
+        data = [
+            {
+                "id": "evt_{}".format(i),
+                "type": "invoice.finalized",
+                "created": 1704067200 + i,
+                "data": {"object": {"customer": "cus_1"}},
+            }
+            for i in range(3)
+        ]
+        assert len(ingest_events(self.session, data[:2])) == 2
+        self.session.commit()
+        # events that were delivered before are skipped
+        event_ids = ingest_events(self.session, data)
+        self.session.commit()
+        assert len(event_ids) == 1
+        event = self.session.query(Event).filter(Event.id == event_ids[0]).one()
+        assert event.provider_id == "evt_2"
+        assert event.status == "unprocessed"
+        assert event.ext_id is not None
+        assert self.session.query(Event).count() == 3
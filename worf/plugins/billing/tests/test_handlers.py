@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+from worf.plugins.billing.handlers import EventHandlers
+from worf.plugins.billing.models import Event
+from worf.settings import settings
+
+
+def plugin_handler(session, event):
+    return True
+
+
+class TestEventHandlers(TestCase):
+    def test_dispatch(self):
+        handlers = EventHandlers("test")
+
+        @handlers.register("invoice.finalized")
+        def handle_invoice(session, event):
+            pass
+
+        assert handlers.get("invoice.finalized") is handle_invoice
+        assert handlers.get("invoice.paid") is None
+
+        event = Event(type="invoice.finalized")
+        assert handlers.handle(handle_invoice, None, event) is False
+        metrics = handlers.snapshot()["invoice.finalized"]
+        assert metrics["events"] == 1
+        assert metrics["deferred"] == 0
+
+    def test_errors(self):
+        handlers = EventHandlers("test")
+
+        @handlers.register("invoice.finalized")
+        def handle_invoice(session, event):
+            raise ValueError("invalid invoice")
+
+        with self.assertRaises(ValueError):
+            handlers.handle(handle_invoice, None, Event(type="invoice.finalized"))
+        assert handlers.snapshot()["invoice.finalized"]["errors"] == 1
+
+    def test_plugin_handlers(self):
+        name = "billing.plugintest.event_handlers"
+        settings.providers[name].append({"invoice.finalized": plugin_handler})
+        try:
+            handlers = EventHandlers("plugintest")
+            handlers.register("invoice.finalized")(lambda session, event: None)
+            # handlers of plugins replace the built-in ones
+            assert handlers.get("invoice.finalized") is plugin_handler
+            event = Event(type="invoice.finalized")
+            assert handlers.handle(plugin_handler, None, event) is True
+            assert handlers.snapshot()["invoice.finalized"]["deferred"] == 1
+        finally:
+            del settings.providers[name]
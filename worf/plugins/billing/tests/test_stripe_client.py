@@ -0,0 +1,90 @@
+from unittest import TestCase
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from worf.plugins.billing.providers.stripe.client import StripeClient, endpoint_name
+
+import threading
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.server.requests.append(dict(self.headers))
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = b'{"id": "cus_123"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestStripeClient(TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("localhost", 0), Handler)
+        self.server.requests = []
+        self.server.statuses = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = StripeClient(
+            "sk_test",
+            base_url="http://localhost:{}".format(self.server.server_port),
+            backoff=0.01,
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retry(self):
+        self.server.statuses = [503, 429]
+        response = self.client.request("POST", "/v1/customers", data={"a": "b"})
+        assert response.status_code == 200
+        assert len(self.server.requests) == 3
+        # all attempts use the same idempotency key
+        keys = {headers["Idempotency-Key"] for headers in self.server.requests}
+        assert len(keys) == 1
+        metrics = self.client.metrics.snapshot()["POST /v1/customers"]
+        assert metrics["requests"] == 1
+        assert metrics["retries"] == 2
+        assert metrics["errors"] == 0
+
+    def test_give_up(self):
+        self.server.statuses = [500, 500, 500, 500]
+        response = self.client.request("POST", "/v1/customers/cus_NffrFeUfNV2Hib")
+        assert response.status_code == 500
+        assert len(self.server.requests) == 3
+        metrics = self.client.metrics.snapshot()["POST /v1/customers/{id}"]
+        assert metrics["errors"] == 1
+
+    def test_no_retry_on_client_error(self):
+        self.server.statuses = [400]
+        response = self.client.request("POST", "/v1/customers")
+        assert response.status_code == 400
+        assert len(self.server.requests) == 1
+
+    def test_endpoint_name(self):
+        assert (
+            endpoint_name("GET", "/v1/subscriptions/sub_1MowQVLkdIwHu7ixeRlqHVzs?a=b")
+            == "GET /v1/subscriptions/{id}"
+        )
+        assert endpoint_name("POST", "/v1/checkout/sessions") == (
+            "POST /v1/checkout/sessions"
+        )
+        assert (
+            endpoint_name(
+                "GET", "/v1/checkout/sessions/cs_test_a1RxKq9tr7A0Ve6Ot0bwYpBq"
+            )
+            == "GET /v1/checkout/sessions/{id}"
+        )
+        # names of resources aren't IDs
+        assert endpoint_name("GET", "/v1/tax_rates") == "GET /v1/tax_rates"
+        assert endpoint_name("POST", "/v1/setup_intents") == "POST /v1/setup_intents"
+        assert (
+            endpoint_name(
+                "POST", "/v1/payment_methods/pm_1MqLiJLkdIwHu7ixUEgbFdYF/attach"
+            )
+            == "POST /v1/payment_methods/{id}/attach"
+        )
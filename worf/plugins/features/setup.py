@@ -1,10 +1,14 @@
 from .models import Features, clean_db
-from .api.v1.routes import routes
-from .providers.profile import features_profile
+
+from worf.utils.lazy import Lazy
 
 config = {
     "clean_db": clean_db,
-    "api": [{"routes": routes, "version": "v1"}],
+    "api": [
+        {"routes": Lazy("worf.plugins.features.api.v1.routes:routes"), "version": "v1"}
+    ],
     "models": [Features],
-    "providers": {"profile": features_profile},
+    "providers": {
+        "profile": Lazy("worf.plugins.features.providers.profile:features_profile")
+    },
 }
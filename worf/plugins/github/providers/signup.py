@@ -2,7 +2,10 @@ from worf.settings import settings
 
 from ..forms import GithubForm
 from worf.models import LoginProvider
-import requests
+from worf.api.identity_providers import (
+    identity_provider_client,
+    IdentityProviderUnavailable,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,10 +34,6 @@ class GithubSignup(object):
         form = GithubForm(data=data)
 
         gh_settings = settings.get("github", {})
-        host = gh_settings["host"]
-        client_id = gh_settings["client_id"]
-        client_secret = gh_settings["client_secret"]
-        redirect_uri = gh_settings["redirect_uri"]
 
         if not form.validate():
             return {
@@ -52,8 +51,27 @@ class GithubSignup(object):
                 return err
             return {"data": gh_settings["user_response_data"]}
 
+        try:
+            return self.retrieve_user_data(form, gh_settings)
+        except IdentityProviderUnavailable:
+            return {
+                "error": {"message": "identity provider unavailable"},
+                "status": 503,
+            }
+
+    def retrieve_user_data(self, form, gh_settings):
+        """
+        Exchanges the auth code for an access token and retrieves the data of
+        the user with it.
+        """
+        host = gh_settings["host"]
+        client_id = gh_settings["client_id"]
+        client_secret = gh_settings["client_secret"]
+        redirect_uri = gh_settings["redirect_uri"]
+        err = {"error": {"message": "authentication failed"}}
+
         # we retrieve an access token
-        access_token_response = requests.post(
+        access_token_response = identity_provider_client.post(
             f"https://{host}/login/oauth/access_token",
             data={
                 "client_id": client_id,
@@ -77,12 +95,14 @@ class GithubSignup(object):
 
         headers = {"Authorization": f"token {access_token}"}
 
-        user_response = requests.get(f"https://api.{host}/user", headers=headers)
+        user_response = identity_provider_client.get(
+            f"https://api.{host}/user", headers=headers
+        )
 
         if user_response.status_code != 200:
             return err
 
-        email_response = requests.get(
+        email_response = identity_provider_client.get(
             f"https://api.{host}/user/emails", headers=headers
         )
 
@@ -1,4 +1,4 @@
-from .providers import GithubLogin, GithubSignup
+from worf.utils.lazy import Lazy
 from worf.settings import settings
 
 
@@ -17,8 +17,8 @@ def client_settings():
 
 config = {
     "providers": {
-        "login.github": GithubLogin,
-        "signup.github": GithubSignup,
+        "login.github": Lazy("worf.plugins.github.providers:GithubLogin"),
+        "signup.github": Lazy("worf.plugins.github.providers:GithubSignup"),
         "client_settings": client_settings,
     }
 }
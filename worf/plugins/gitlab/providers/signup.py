@@ -2,7 +2,10 @@ from worf.settings import settings
 
 from ..forms import GitlabForm
 from worf.models import LoginProvider
-import requests
+from worf.api.identity_providers import (
+    identity_provider_client,
+    IdentityProviderUnavailable,
+)
 import logging
 
 
@@ -29,10 +32,6 @@ class GitlabSignup(object):
         form = GitlabForm(data=data)
 
         gl_settings = settings.get("gitlab", {})
-        host = gl_settings["host"]
-        client_id = gl_settings["client_id"]
-        client_secret = gl_settings["client_secret"]
-        redirect_uri = gl_settings["redirect_uri"]
 
         if not form.validate():
             return {
@@ -50,8 +49,26 @@ class GitlabSignup(object):
                 return err
             return {"data": gl_settings["user_response_data"]}
 
+        try:
+            return self.retrieve_user_data(form, gl_settings)
+        except IdentityProviderUnavailable:
+            return {
+                "error": {"message": "identity provider unavailable"},
+                "status": 503,
+            }
+
+    def retrieve_user_data(self, form, gl_settings):
+        """
+        Exchanges the auth code for an access token and retrieves the data of
+        the user with it.
+        """
+        host = gl_settings["host"]
+        client_id = gl_settings["client_id"]
+        client_secret = gl_settings["client_secret"]
+        err = {"error": {"message": "authentication failed"}}
+
         # we retrieve an access token
-        access_token_response = requests.post(
+        access_token_response = identity_provider_client.post(
             f"https://{host}/oauth/token",
             data={
                 "client_id": client_id,
@@ -75,7 +92,9 @@ class GitlabSignup(object):
 
         headers = {"Authorization": f"Bearer {access_token}"}
 
-        user_response = requests.get(f"https://{host}/api/v4/user", headers=headers)
+        user_response = identity_provider_client.get(
+            f"https://{host}/api/v4/user", headers=headers
+        )
 
         if user_response.status_code != 200:
             return err
@@ -1,4 +1,4 @@
-from .providers import GitlabLogin, GitlabSignup
+from worf.utils.lazy import Lazy
 from worf.settings import settings
 
 
@@ -17,8 +17,8 @@ def client_settings():
 
 config = {
     "providers": {
-        "login.gitlab": GitlabLogin,
-        "signup.gitlab": GitlabSignup,
+        "login.gitlab": Lazy("worf.plugins.gitlab.providers:GitlabLogin"),
+        "signup.gitlab": Lazy("worf.plugins.gitlab.providers:GitlabSignup"),
         "client_settings": client_settings,
     }
 }
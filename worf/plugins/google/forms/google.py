@@ -1,5 +1,9 @@
 from worf.utils.forms import Form, Field
 from worf.settings import settings
+from worf.api.identity_providers import (
+    identity_provider_client,
+    IdentityProviderUnavailable,
+)
 from worf.utils.forms.validators import (
     String,
     Optional,
@@ -13,6 +17,7 @@ from worf.utils.forms.validators import (
 
 from google.oauth2 import id_token
 from google.auth.transport import requests
+from google.auth.exceptions import TransportError
 
 
 class GoogleIDToken:
@@ -45,11 +50,18 @@ class GoogleIDToken:
                 )
             return ["not a valid token"], None, True
 
+        def verify():
+            # fetches Google's certificates if necessary
+            request = requests.Request(session=identity_provider_client.session())
+            return id_token.verify_oauth2_token(value, request, client_id)
+
         try:
-            id_info = id_token.verify_oauth2_token(value, requests.Request(), client_id)
+            id_info = identity_provider_client.run(verify)
             return [], id_info, False
         except ValueError:
             return ["not a valid token"], None, True
+        except (IdentityProviderUnavailable, TransportError):
+            return ["cannot verify the token right now"], None, True
 
 
 class GoogleForm(Form):
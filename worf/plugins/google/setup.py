@@ -1,4 +1,4 @@
-from .providers import GoogleLogin, GoogleSignup
+from worf.utils.lazy import Lazy
 from worf.settings import settings
 
 
@@ -8,8 +8,8 @@ def client_settings():
 
 config = {
     "providers": {
-        "login.google": GoogleLogin,
-        "signup.google": GoogleSignup,
+        "login.google": Lazy("worf.plugins.google.providers:GoogleLogin"),
+        "signup.google": Lazy("worf.plugins.google.providers:GoogleSignup"),
         "client_settings": client_settings,
     }
 }
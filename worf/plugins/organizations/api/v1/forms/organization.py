@@ -57,6 +57,7 @@ class OrganizationRoleForm(Form):
 
 class OrganizationsForm(Form):
     offset = Field([Optional(default=0), Integer(convert=True, min=0)])
+    cursor = Field([Optional(), String(), Length(max=1000)])
     limit = Field([Optional(default=20), Integer(convert=True, min=1, max=1000)])
     direction = Field(
         [Optional(default="desc"), String(), Choices(set(["desc", "asc"]))]
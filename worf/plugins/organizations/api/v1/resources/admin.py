@@ -9,8 +9,10 @@ from ..forms.organization import (
 )
 
 from worf.api.decorators.user import authorized
+from worf.api.decorators.database import read_only
 from worf.api.decorators.uuid import valid_uuid
 from worf.api.resource import Resource
+from worf.api.pagination import paginate, InvalidCursor
 from worf.models import User
 from ....models import Organization, OrganizationRole
 from ..decorators.organization import organization
@@ -25,6 +27,7 @@ class OrganizationRolesAdmin(Resource):
     """
 
     @authorized(scopes=("admin",), superuser=True)
+    @read_only
     @valid_uuid(field="organization_id")
     @organization()
     def get(self, organization_id):
@@ -154,20 +157,32 @@ class OrganizationsAdmin(Resource):
             queries.append(
                 Organization.name.ilike("%{}%".format(form.valid_data["query"].strip()))
             )
-        organizations = (
-            request.session.query(Organization)
-            .filter(*queries)
-            .order_by(Organization.name)
-            .limit(params["limit"] + 1)
-            .offset(params["offset"])
-        )
+        organizations = request.session.query(Organization).filter(*queries)
+        if self.wants_stream():
+            return self.stream(
+                organizations.order_by(Organization.name, Organization.id),
+                lambda organization: organization.export(),
+            )
+        try:
+            organizations, has_more, next_cursor = paginate(
+                organizations,
+                (Organization.name, Organization.id),
+                params["limit"],
+                cursor=params.get("cursor"),
+                offset=params["offset"],
+            )
+        except InvalidCursor:
+            return (
+                {"message": "invalid data", "errors": {"cursor": ["invalid cursor"]}},
+                400,
+            )
         return (
             {
                 "organizations": [
-                    organization.export()
-                    for organization in organizations[: params["limit"]]
+                    organization.export() for organization in organizations
                 ],
-                "has_more": True if organizations.count() > params["limit"] else False,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
                 "params": params,
             },
             200,
@@ -1,14 +1,25 @@
 from .models import Organization, OrganizationRole, clean_db
-from .api.v1.routes import routes
-from .providers.profile import organization_profile
-from .hooks import confirm_invite_and_setup_role
-from .cli import organizations
+
+from worf.utils.lazy import Lazy
 
 config = {
     "clean_db": clean_db,
-    "api": [{"routes": routes, "version": "v1"}],
+    "api": [
+        {
+            "routes": Lazy("worf.plugins.organizations.api.v1.routes:routes"),
+            "version": "v1",
+        }
+    ],
     "models": [Organization, OrganizationRole],
-    "commands": [organizations],
-    "providers": {"profile": organization_profile},
-    "hooks": {"invitation.confirm": confirm_invite_and_setup_role},
+    "commands": [Lazy("worf.plugins.organizations.cli:organizations")],
+    "providers": {
+        "profile": Lazy(
+            "worf.plugins.organizations.providers.profile:organization_profile"
+        )
+    },
+    "hooks": {
+        "invitation.confirm": Lazy(
+            "worf.plugins.organizations.hooks:confirm_invite_and_setup_role"
+        )
+    },
 }
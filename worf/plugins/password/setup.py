@@ -1,7 +1,11 @@
-from .providers import PasswordLogin, PasswordSignup
-from .api.v1.routes import routes
+from worf.utils.lazy import Lazy
 
 config = {
-    "api": [{"routes": routes, "version": "v1"}],
-    "providers": {"login.password": PasswordLogin, "signup.password": PasswordSignup},
+    "api": [
+        {"routes": Lazy("worf.plugins.password.api.v1.routes:routes"), "version": "v1"}
+    ],
+    "providers": {
+        "login.password": Lazy("worf.plugins.password.providers:PasswordLogin"),
+        "signup.password": Lazy("worf.plugins.password.providers:PasswordSignup"),
+    },
 }
@@ -16,5 +16,13 @@ if _worf_settings_d:
             if fn.endswith(".yml") and not fn.startswith(".")
         ]
 
-raw_settings = load_settings(settings_filenames)
+# the parsed settings are cached, unless WORF_SETTINGS_CACHE is set to ""
+_settings_cache = os.environ.get(
+    "WORF_SETTINGS_CACHE",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "worf"
+    ),
+)
+
+raw_settings = load_settings(settings_filenames, cache_dir=_settings_cache or None)
 settings = Settings(raw_settings)
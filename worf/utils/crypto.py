@@ -0,0 +1,46 @@
+from cryptography.fernet import Fernet, MultiFernet
+
+import json
+
+
+class Crypto:
+
+    """
+    Encrypts and decrypts JSON-serializable data with Fernet.
+
+    Data is always encrypted with the first key. Additional keys are only
+    used for decryption, so keys can be rotated by adding a new key in front
+    of the old one, re-encrypting existing tokens with `rotate` and removing
+    the old key afterwards.
+    """
+
+    def __init__(self, keys):
+        if not keys:
+            raise ValueError("at least one encryption key is required")
+        self.keys = tuple(keys)
+        fernets = [Fernet(key) for key in self.keys]
+        if len(fernets) == 1:
+            self.fernet = fernets[0]
+        else:
+            self.fernet = MultiFernet(fernets)
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            [settings.get("encryption.key")]
+            + list(settings.get("encryption.previous_keys") or [])
+        )
+
+    def encrypt(self, data):
+        return self.fernet.encrypt(json.dumps(data).encode("utf-8"))
+
+    def decrypt(self, token, ttl=None):
+        return json.loads(self.fernet.decrypt(token, ttl=ttl).decode("utf-8"))
+
+    def rotate(self, token):
+        """
+        Re-encrypts the given token with the first key, keeping its timestamp.
+        """
+        if isinstance(self.fernet, MultiFernet):
+            return self.fernet.rotate(token)
+        return token
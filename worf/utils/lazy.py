@@ -0,0 +1,53 @@
+from werkzeug.utils import import_string
+
+import threading
+
+
+class Lazy:
+
+    """
+    A reference to an object (e.g. "worf.plugins.billing.cli:billing") that
+    is only imported when it is first used. Plugins use it in their config so
+    that loading a plugin does not import modules that the current process
+    (API, worker or CLI) might never need.
+
+    Calling the reference calls the referenced object, so it can be used in
+    place of provider classes, provider functions and hooks.
+    """
+
+    def __init__(self, import_name):
+        self.import_name = import_name
+        module, _, name = import_name.rpartition(":")
+        self.__module__ = module
+        self.__name__ = name
+        self.lock = threading.Lock()
+        self.resolved = False
+        self.obj = None
+
+    def resolve(self):
+        if not self.resolved:
+            with self.lock:
+                if not self.resolved:
+                    self.obj = import_string(self.import_name)
+                    self.resolved = True
+        return self.obj
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return "Lazy({!r})".format(self.import_name)
+
+
+def resolve(value):
+    """
+    Returns the given value with all `Lazy` references (also those in lists,
+    tuples and dictionaries) replaced by the referenced objects.
+    """
+    if isinstance(value, Lazy):
+        return value.resolve()
+    if isinstance(value, dict):
+        return {k: resolve(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(resolve(v) for v in value)
+    return value
@@ -1,8 +1,6 @@
 from .email.jinja import TemplateLoader
 from jinja2 import Environment, BaseLoader, TemplateNotFound
 from worf.settings import settings
-from weasyprint import HTML
-from weasyprint.text.fonts import FontConfiguration
 import mimetypes
 import os
 
@@ -27,6 +25,10 @@ class URLFetcher:
 
 
 def pdf(template_path, context, language=None):
+    # WeasyPrint takes long to import, so we only import it when it's needed
+    from weasyprint import HTML
+    from weasyprint.text.fonts import FontConfiguration
+
     lang = language
     if lang is None:
         lang = settings.get("language", "en")
@@ -0,0 +1,140 @@
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+
+    """
+    Collects statistics about the connections of a database engine's pool,
+    e.g. how often connections were checked out, how long callers had to
+    wait for a connection and how old the pooled connections are.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.waits = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.timeouts = 0
+            self.connected_at = {}
+
+    def attach(self, engine):
+        event.listen(engine, "connect", self.on_connect)
+        event.listen(engine, "checkout", self.on_checkout)
+        event.listen(engine, "checkin", self.on_checkin)
+        event.listen(engine, "invalidate", self.on_invalidate)
+        event.listen(engine, "close", self.on_close)
+        if isinstance(engine.pool, MeteredQueuePool):
+            engine.pool.metrics = self
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connects += 1
+            self.connected_at[id(connection_record)] = time.monotonic()
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self.lock:
+            self.checkouts += 1
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.checkins += 1
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self.lock:
+            self.invalidations += 1
+
+    def on_close(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connected_at.pop(id(connection_record), None)
+
+    def record_wait(self, seconds, timeout=False):
+        with self.lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timeout:
+                self.timeouts += 1
+
+    def snapshot(self, pool=None):
+        """
+        Returns the collected statistics (and the state of the given pool)
+        as a dictionary.
+        """
+        now = time.monotonic()
+        with self.lock:
+            ages = [now - connected_at for connected_at in self.connected_at.values()]
+            data = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "timeouts": self.timeouts,
+                "connections": len(ages),
+                "max_connection_age_seconds": max(ages) if ages else 0.0,
+            }
+        if isinstance(pool, QueuePool):
+            data.update(
+                {
+                    "size": pool.size(),
+                    "checked_in": pool.checkedin(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": pool.overflow(),
+                }
+            )
+        return data
+
+
+class MeteredQueuePool(QueuePool):
+
+    """
+    A queue pool that reports to its metrics how long callers had to wait for
+    a connection when all connections were in use.
+    """
+
+    metrics = None
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def exhausted(self):
+        if self._max_overflow < 0:
+            return False
+        return self.checkedout() >= self.size() + self._max_overflow
+
+    def _do_get(self):
+        if self.metrics is None or not self.exhausted():
+            return super()._do_get()
+        start = time.monotonic()
+        try:
+            connection = super()._do_get()
+        except TimeoutError:
+            self.metrics.record_wait(time.monotonic() - start, timeout=True)
+            logger.error(
+                "Timeout while waiting for a database connection: {}".format(
+                    self.metrics.snapshot(self)
+                )
+            )
+            raise
+        self.metrics.record_wait(time.monotonic() - start)
+        return connection
@@ -0,0 +1,77 @@
+from cachetools import TTLCache
+
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# the replication lag of a replica in seconds (0 if it replayed everything
+# it received, e.g. because there were no writes, or if it is a primary)
+REPLICATION_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(
+        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+    )
+END
+"""
+
+
+class ReplicaRouter:
+
+    """
+    Decides whether reads can be sent to the read replica.
+
+    Reads go to the primary if the replica lags behind by more than
+    `max_lag` seconds (which is checked at most every `check_interval`
+    seconds) or if it can't be reached. Reads of a client that wrote to the
+    database during the last `pin_seconds` seconds go to the primary as well,
+    so clients see their own writes. Writes are only known to the process
+    that performed them, so `pin_seconds` should exceed the usual lag.
+    """
+
+    def __init__(self, max_lag=5, check_interval=5, pin_seconds=10):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.lag = None
+        self.checked_at = None
+        self.recent_writers = TTLCache(maxsize=100000, ttl=pin_seconds)
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            max_lag=settings.get("db.replica.max_lag", 5),
+            check_interval=settings.get("db.replica.check_interval", 5),
+            pin_seconds=settings.get("db.replica.pin_seconds", 10),
+        )
+
+    def record_write(self, writer):
+        with self.lock:
+            self.recent_writers[writer] = True
+
+    def pinned(self, writer):
+        if writer is None:
+            return False
+        with self.lock:
+            return writer in self.recent_writers
+
+    def check_lag(self, engine):
+        try:
+            with engine.connect() as connection:
+                return float(connection.exec_driver_sql(REPLICATION_LAG_QUERY).scalar())
+        except Exception:
+            logger.warning("Cannot determine the replication lag of the replica.")
+            return None
+
+    def replica_usable(self, engine):
+        checked_at = self.checked_at
+        if checked_at is None or time.monotonic() - checked_at > self.check_interval:
+            with self.lock:
+                # another thread might have checked the lag in the meantime
+                if self.checked_at == checked_at:
+                    self.lag = self.check_lag(engine)
+                    self.checked_at = time.monotonic()
+        return self.lag is not None and self.lag <= self.max_lag
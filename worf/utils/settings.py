@@ -1,7 +1,9 @@
 from contextlib import contextmanager
 import importlib
 import logging
+import threading
 import hashlib
+import pickle
 import yaml
 import json
 import sys
@@ -9,16 +11,29 @@ import os
 
 from sqlalchemy.orm.scoping import scoped_session
 from sqlalchemy.orm.session import sessionmaker
-from cryptography.fernet import Fernet
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
 from collections import defaultdict, OrderedDict
 from functools import wraps
+from types import MappingProxyType
 import abc
 
 from .settings_form import SettingsForm
+from .translations import TranslationCatalog
+from .lazy import resolve
+from .crypto import Crypto
+from .pool import PoolMetrics, MeteredQueuePool
+from .replica import ReplicaRouter
 
 logger = logging.getLogger(__name__)
 
+# we use the libyaml-based loader if it is available, as it is much faster
+YAMLLoader = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+# needs to be changed if the format (or the file mode) of cached settings
+# changes
+SETTINGS_CACHE_VERSION = 2
+
 
 class Worker(abc.ABC):
     @abc.abstractmethod
@@ -32,18 +47,28 @@ class Worker(abc.ABC):
 
 class CeleryWorker(Worker):
     def __init__(self, settings, config):
-        from .celery import make_celery
-
         self.settings = settings
         self.config = config
-        self.celery = make_celery(config)
-        for task in self.settings.tasks:
-            self.register(task)
+        self._celery = None
+
+    @property
+    def celery(self):
+        # we only import Celery when we send or process the first task
+        if self._celery is None:
+            from .celery import make_celery
+
+            self._celery = make_celery(self.config)
+            for task in self.settings.tasks:
+                self._celery.task(task)
+        return self._celery
 
     def register(self, task):
-        self.celery.task(task)
+        if self._celery is not None:
+            self._celery.task(task)
 
     def run(self):
+        # we make sure all tasks of all plugins are registered
+        self.settings.plugin_registry.resolve_all()
         argv = ["worker", "--loglevel=INFO", "-B"]
         self.celery.worker_main(argv)
 
@@ -70,15 +95,142 @@ class ThreadWorker(Worker):
 workers = {"thread": ThreadWorker, "celery": CeleryWorker}
 
 
+class PluginRegistry:
+
+    """
+    Holds the setup modules and configurations of all configured plugins
+    together with the merged API, export and include maps, so they only need
+    to be resolved once instead of on every lookup.
+
+    Plugin configs can reference objects lazily (see `worf.utils.lazy`), the
+    API routes are only resolved when they are requested.
+    """
+
+    def __init__(self, settings):
+        modules = {}
+        configs = {}
+        for name in settings.get("plugins", {}):
+            modules[name] = settings.import_plugin_module(name)
+            configs[name] = modules[name].config
+
+        exports = defaultdict(tuple)
+        includes = defaultdict(frozenset)
+        for name, config in configs.items():
+            for resource_name, resource_exports in config.get("exports", {}).items():
+                exports[resource_name] += tuple(resource_exports)
+            for resource_name, resource_includes in (
+                config.get("includes") or {}
+            ).items():
+                includes[resource_name] |= frozenset(resource_includes)
+
+        self.modules = MappingProxyType(modules)
+        self.configs = MappingProxyType(configs)
+        self.exports = MappingProxyType(dict(exports))
+        self.includes = MappingProxyType(dict(includes))
+        self._apis = None
+
+    @property
+    def apis(self):
+        if self._apis is None:
+            self._apis = MappingProxyType(
+                {
+                    name: resolve(config["api"])
+                    for name, config in self.configs.items()
+                    if config.get("api")
+                }
+            )
+        return self._apis
+
+    def resolve_all(self):
+        """
+        Imports all lazily referenced objects of all plugins, e.g. so that
+        all tasks are registered before the worker starts.
+        """
+        for config in self.configs.values():
+            resolve(config)
+
+
+def freeze(value):
+    """
+    Returns a read-only copy of the given settings value.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(v) for key, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """
+    Returns a modifiable copy of the given (read-only) settings value.
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+def flatten(d, prefix="", index=None):
+    """
+    Returns a dictionary that maps the dotted key of every value in the
+    given nested dictionary to that value.
+    """
+    if index is None:
+        index = {}
+    for key, value in d.items():
+        # keys containing dots can't be looked up via `Settings.get`
+        if not isinstance(key, str) or "." in key:
+            continue
+        dotted_key = prefix + key
+        index[dotted_key] = value
+        if isinstance(value, (dict, MappingProxyType)):
+            flatten(value, dotted_key + ".", index)
+    return index
+
+
+class FrozenSettings:
+
+    """
+    A read-only view of the settings values at the time it was created.
+    """
+
+    def __init__(self, d):
+        self._d = freeze(d)
+        self._index = flatten(self._d)
+
+    def get(self, key, default=None):
+        return self._index.get(key, default)
+
+    def __getitem__(self, key):
+        return self._index[key]
+
+    def __contains__(self, key):
+        return key in self._index
+
+
 class Settings:
     def __init__(self, d):
         self._d = d
+        self._frozen = None
+        self._translation_catalog = None
+        self._crypto = None
         self.providers = defaultdict(list)
         self.hooks = defaultdict(list)
         self.sessionmaker = None
+        self.engine = None
+        self.pool_metrics = PoolMetrics()
+        self.replica_sessionmaker = None
+        self.replica_engine = None
+        self.replica_router = None
+        self.replica_lock = threading.Lock()
+        self.replica_pool_metrics = PoolMetrics()
+        self.local = threading.local()
         self.initialized = False
         self.tasks = []
         self.worker = None
+        self._plugin_registry = None
 
     def validate(self):
         self.form = SettingsForm(self._d)
@@ -92,6 +244,28 @@ class Settings:
 
     def update(self, d):
         update(self._d, d)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Discards the frozen view (and thereby the key index) and the objects
+        built from the settings, needs to be called if the settings tree is
+        modified other than via `set` or `update`.
+        """
+        self._frozen = None
+        self._translation_catalog = None
+        self._crypto = None
+
+    @property
+    def frozen(self):
+        """
+        Returns a read-only view of the current settings, e.g. for use during
+        requests. A new view is created when the settings change.
+        """
+        frozen = self._frozen
+        if frozen is None:
+            frozen = self._frozen = FrozenSettings(self._d)
+        return frozen
 
     def setup_logging(self, level):
         for handler in logging.root.handlers[:]:
@@ -106,30 +280,93 @@ class Settings:
             logger.warning("No salt value defined...")
         return hashlib.sha256(value.encode("utf-8") + salt.encode("utf-8")).hexdigest()
 
+    @property
+    def crypto(self):
+        crypto = self._crypto
+        if crypto is None:
+            crypto = self._crypto = Crypto.from_settings(self)
+        return crypto
+
     def encrypt(self, data):
-        key = self.get("encryption.key")
-        f = Fernet(key)
-        data_bytes = json.dumps(data).encode("utf-8")
-        return f.encrypt(data_bytes)
+        return self.crypto.encrypt(data)
 
     def decrypt(self, data, ttl=None):
-        key = self.get("encryption.key")
-        f = Fernet(key)
-        data_bytes = f.decrypt(data, ttl=ttl)
-        return json.loads(data_bytes.decode("utf-8"))
+        return self.crypto.decrypt(data, ttl=ttl)
 
-    def get_db_engine(self):
+    def get_db_engine(self, url=None, metrics=None):
         """
-        Returns a SQLAlchemy database engine.
+        Returns a SQLAlchemy database engine (for the primary database unless
+        another URL is given).
         """
         params = self.get("db").copy()
-        db_url = self.get("db.url").format(**params)
-        engine = create_engine(db_url, echo=self.get("db.echo"))
+        db_url = (url or self.get("db.url")).format(**params)
+        options = {}
+        if db_url.startswith("postgresql"):
+            options = self.get_pool_options()
+        engine = create_engine(db_url, echo=self.get("db.echo"), **options)
+        (metrics or self.pool_metrics).attach(engine)
+
+        statement_timeout = self.get("db.pool.statement_timeout")
+        if statement_timeout and self.get("db.pool.pgbouncer"):
+            # PgBouncer does not support the "options" startup parameter and
+            # can hand out a different server connection for each transaction,
+            # so we set the timeout for every transaction
+            @event.listens_for(engine, "begin")
+            def set_statement_timeout(connection):
+                connection.exec_driver_sql(
+                    "SET LOCAL statement_timeout = {:d}".format(statement_timeout)
+                )
+
         return engine
 
+    def get_pool_options(self):
+        """
+        Returns the connection pool options for `create_engine` as configured
+        in the `db.pool` settings.
+        """
+        pool = self.get("db.pool") or {}
+        if pool.get("pgbouncer"):
+            # PgBouncer pools the connections for us
+            return {"poolclass": NullPool}
+        options = {
+            "poolclass": MeteredQueuePool,
+            "pool_size": pool.get("size", 5),
+            "max_overflow": pool.get("max_overflow", 10),
+            "pool_timeout": pool.get("timeout", 30),
+            "pool_recycle": pool.get("recycle", -1),
+            "pool_pre_ping": pool.get("pre_ping", False),
+        }
+        if pool.get("statement_timeout"):
+            options["connect_args"] = {
+                "options": "-c statement_timeout={:d}".format(pool["statement_timeout"])
+            }
+        return options
+
+    def get_pool_status(self):
+        """
+        Returns statistics about the connection pool of the current engine.
+        """
+        return self.pool_metrics.snapshot(
+            self.engine.pool if self.engine is not None else None
+        )
+
     @contextmanager
     def session(self, fresh=False, retry=False):
         session = self.get_session(fresh=fresh, retry=retry)
+        if self.in_unit_of_work:
+            # the unit of work is committed once, when it ends, so a block only
+            # flushes its changes (within a savepoint, so an exception only
+            # undoes the changes of the block)
+            savepoint = session.begin_nested()
+            try:
+                yield session
+                if savepoint.is_active:
+                    savepoint.commit()
+            except:
+                if savepoint.is_active:
+                    savepoint.rollback()
+                raise
+            return
         try:
             yield session
             session.commit()
@@ -147,46 +384,261 @@ class Settings:
             engine = self.get_db_engine()
             if self.sessionmaker is not None:
                 self.dispose_all_sessions()
-            self.sessionmaker = scoped_session(
-                sessionmaker(bind=engine, expire_on_commit=False)
-            )
+            self.engine = engine
+            factory = sessionmaker(bind=engine, expire_on_commit=False)
+            event.listen(factory, "after_flush", self.on_primary_flush)
+            event.listen(factory, "do_orm_execute", self.on_primary_execute)
+            self.sessionmaker = scoped_session(factory)
+        if self.in_unit_of_work and getattr(self.local, "read_only", False):
+            session = self.get_replica_session()
+            if session is not None:
+                return session
+        if self.in_unit_of_work and not self.sessionmaker.registry.has():
+            # all sessions of a unit of work use a single connection
+            return self.sessionmaker(bind=self.engine.connect())
         return self.sessionmaker()
 
+    def on_primary_flush(self, session, flush_context):
+        # reads that follow a write go to the primary, so they see the write
+        self.local.wrote = True
+
+    def on_primary_execute(self, orm_execute_state):
+        # bulk statements (e.g. `session.execute(update(...))`) don't flush,
+        # textual SQL statements aren't recognized as writes though
+        if (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+        ):
+            self.local.wrote = True
+
+    def get_replica_session(self):
+        """
+        Returns a session for the read replica of the current unit of work,
+        or `None` if reads should go to the primary: if no replica is
+        configured, if it lags behind too much or if the unit of work (or
+        its owner, shortly before) wrote to the primary.
+        """
+        replica_url = self.get("db.replica.url")
+        if not replica_url:
+            return None
+        if self.replica_sessionmaker is None:
+            with self.replica_lock:
+                # another thread might have created the engine meanwhile
+                if self.replica_sessionmaker is None:
+                    self.replica_engine = self.get_db_engine(
+                        url=replica_url, metrics=self.replica_pool_metrics
+                    )
+                    self.replica_sessionmaker = scoped_session(
+                        sessionmaker(bind=self.replica_engine, expire_on_commit=False)
+                    )
+        if getattr(self.local, "wrote", False):
+            return None
+        router = self.get_replica_router()
+        if router.pinned(getattr(self.local, "owner", None)):
+            return None
+        if self.replica_sessionmaker.registry.has():
+            return self.replica_sessionmaker()
+        if not router.replica_usable(self.replica_engine):
+            return None
+        return self.replica_sessionmaker(bind=self.replica_engine.connect())
+
+    def get_replica_router(self):
+        """
+        Returns the router that decides whether reads go to the read replica,
+        or `None` if no replica is configured. The router (and the writers it
+        pins to the primary) outlives the replica engine.
+        """
+        if not self.get("db.replica.url"):
+            return None
+        with self.replica_lock:
+            if self.replica_router is None:
+                self.replica_router = ReplicaRouter.from_settings(self)
+            return self.replica_router
+
+    @contextmanager
+    def read_only(self):
+        """
+        Marks a part of the current unit of work as read-only, so sessions
+        retrieved within it read from the replica if possible. Sessions
+        retrieved before still use the primary, as do sessions retrieved after
+        the unit of work wrote (writes via textual SQL aren't detected, so
+        they need to be followed by reads outside of `read_only`).
+        """
+        read_only = getattr(self.local, "read_only", False)
+        self.local.read_only = True
+        try:
+            yield
+        finally:
+            self.local.read_only = read_only
+
+    def set_unit_of_work_owner(self, owner):
+        """
+        Sets the owner (e.g. the authenticated user) of the current unit of
+        work. If it writes to the primary, reads of the owner go to the
+        primary for the next `db.replica.pin_seconds` seconds.
+        """
+        self.local.owner = owner
+
+    @property
+    def in_unit_of_work(self):
+        return getattr(self.local, "unit_of_work", False)
+
+    def begin_unit_of_work(self):
+        """
+        Begins a unit of work (e.g. an API request) for the current thread.
+        Until it ends, all calls to `session` and `get_session` return the
+        same session, which is created lazily and uses a single database
+        connection. Leaving a `session` block only flushes its changes, they
+        are committed when the unit of work ends (or `commit_unit_of_work` is
+        called). Tasks delayed within the unit of work are only sent once it
+        committed, so they see its changes.
+        """
+        self.local.unit_of_work = True
+        self.local.read_only = False
+        self.local.wrote = False
+        self.local.owner = None
+        self.local.failed = False
+        self.local.delayed = []
+
+    def fail_unit_of_work(self):
+        """
+        Marks the unit of work of the current thread as failed (e.g. because
+        its request handler raised an exception), so its session is rolled
+        back instead of committed when it ends.
+        """
+        self.local.failed = True
+
+    def commit_unit_of_work(self):
+        """
+        Commits the changes of the unit of work of the current thread so far
+        without ending it (e.g. before the response of a request is sent, so
+        a failing commit can still be reported). Failed units of work are
+        rolled back instead.
+        """
+        if not self.in_unit_of_work:
+            return
+        if self.sessionmaker is None or not self.sessionmaker.registry.has():
+            return
+        session = self.sessionmaker()
+        if getattr(self.local, "failed", False):
+            session.rollback()
+            return
+        try:
+            session.commit()
+        except:
+            session.rollback()
+            raise
+
+    def end_unit_of_work(self, commit=True):
+        """
+        Ends the unit of work of the current thread, commits (or rolls back)
+        its session and closes it together with its connection. Failed units
+        of work are always rolled back. The tasks delayed within the unit of
+        work are sent if it was committed.
+        """
+        if not self.in_unit_of_work:
+            return
+        self.local.unit_of_work = False
+        if getattr(self.local, "failed", False):
+            commit = False
+            self.local.failed = False
+        delayed = getattr(self.local, "delayed", [])
+        self.local.delayed = []
+        owner = getattr(self.local, "owner", None)
+        if self.local.wrote and owner is not None:
+            router = self.get_replica_router()
+            if router is not None:
+                router.record_write(owner)
+        self.local.read_only = False
+        self.local.wrote = False
+        self.local.owner = None
+        if self.replica_sessionmaker is not None:
+            if self.replica_sessionmaker.registry.has():
+                session = self.replica_sessionmaker()
+                connection = session.bind
+                try:
+                    session.rollback()
+                finally:
+                    self.replica_sessionmaker.remove()
+                    connection.close()
+        if self.sessionmaker is not None and self.sessionmaker.registry.has():
+            session = self.sessionmaker()
+            connection = session.bind
+            try:
+                if commit:
+                    session.commit()
+                else:
+                    session.rollback()
+            except:
+                session.rollback()
+                raise
+            finally:
+                self.sessionmaker.remove()
+                connection.close()
+        if commit:
+            for func, kwargs in delayed:
+                self.worker.delay(func, **kwargs)
+
+    @contextmanager
+    def unit_of_work(self):
+        self.begin_unit_of_work()
+        try:
+            yield
+        except:
+            self.end_unit_of_work(commit=False)
+            raise
+        else:
+            self.end_unit_of_work()
+
     def dispose_all_sessions(self):
         """
         Disposes all open sessions.
         """
+        self.dispose_replica()
         if self.sessionmaker is None:
             return
         self.sessionmaker.close_all()
         self.sessionmaker.get_bind().dispose()
         self.sessionmaker = None
 
+    def dispose_replica(self):
+        """
+        Disposes the sessions and the engine of the read replica.
+        """
+        if self.replica_sessionmaker is None:
+            return
+        self.replica_sessionmaker.close_all()
+        self.replica_engine.dispose()
+        self.replica_sessionmaker = None
+        self.replica_engine = None
+
     def initialize(self):
         logger.debug("Initializing settings...")
+        self.reload_plugin_registry()
         self.load_plugins()
+        # we compile the translations (and report problems with them) now
+        self.translation_catalog
         self.initialize_worker()
 
     def initialize_worker(self):
         worker_type = self.get("worker.type")
-        self.worker = workers[worker_type](self, self.get("worker"))
+        self.worker = workers[worker_type](self, thaw(self.get("worker")))
 
     def delay(self, func, **kwargs):
+        if self.in_unit_of_work:
+            # the task is sent once the unit of work committed
+            self.local.delayed.append((func, kwargs))
+            return
         self.worker.delay(func, **kwargs)
 
     def get(self, key, default=None):
         """
-        Get a settings value
+        Get a settings value. Dictionaries and lists are returned as read-only
+        views (see `freeze`), callers that want to modify them need to `thaw`
+        them first.
         """
-        components = key.split(".")
-
-        cd = self._d
-        for component in components:
-            if component in cd:
-                cd = cd[component]
-            else:
-                return default
-        return cd
+        return self.frozen.get(key, default)
 
     def set(self, key, value):
         """
@@ -202,8 +654,23 @@ class Settings:
             del cd[components[-1]]
         else:
             cd[components[-1]] = value
+        self.invalidate()
 
-    def load_plugin_module(self, name):
+    @property
+    def plugin_registry(self):
+        if self._plugin_registry is None:
+            self._plugin_registry = PluginRegistry(self)
+        return self._plugin_registry
+
+    def reload_plugin_registry(self):
+        """
+        Rebuilds the plugin registry, e.g. after the plugin settings were
+        changed in a test.
+        """
+        self._plugin_registry = None
+        return self.plugin_registry
+
+    def import_plugin_module(self, name):
         plugin_data = self.get("plugins.{}".format(name))
         if plugin_data is None:
             raise ValueError("Unknown plugin: {}".format(name))
@@ -212,8 +679,17 @@ class Settings:
         setup_module = importlib.import_module(setup_module_name)
         return setup_module
 
+    def load_plugin_module(self, name):
+        setup_module = self.plugin_registry.modules.get(name)
+        if setup_module is None:
+            return self.import_plugin_module(name)
+        return setup_module
+
     def load_plugin_config(self, name, setup_module=None):
         if setup_module is None:
+            config = self.plugin_registry.configs.get(name)
+            if config is not None:
+                return config
             setup_module = self.load_plugin_module(name)
         return setup_module.config
 
@@ -242,14 +718,15 @@ class Settings:
             self.hooks[name].append(params)
 
         # register task schedule
-        schedule = self.get("worker.schedule", {})
+        schedule = thaw(self.get("worker.schedule", {}))
         schedule.update(plugin_data.get("schedule", {}))
         self.set("worker.schedule", schedule)
 
         for filename in config.get("yaml_settings", []):
             with open(filename) as yaml_file:
-                settings_yaml = yaml.load(yaml_file.read(), Loader=yaml.FullLoader)
+                settings_yaml = yaml.load(yaml_file.read(), Loader=YAMLLoader)
                 update(self._d, settings_yaml, overwrite=False)
+                self.invalidate()
 
     def order_plugins(self):
         plugins = self.get("plugins") or {}
@@ -296,24 +773,14 @@ class Settings:
         """Generator over all routes provided by all plugins
         :return: API dictionary with version, routes and module name
         """
-        apis = {}
-        for plugin_name in self.get("plugins", {}):
-            config = self.load_plugin_config(plugin_name)
-            endpoint_config = config.get("api")
-            if endpoint_config:
-                apis[plugin_name] = endpoint_config
-        return apis
+        return dict(self.plugin_registry.apis)
 
     def get_plugin_exports(self, resource_name):
         """Returns a combined export map for the given resource from all plugins.
         :param resource: resource name
         :return: combined export map for the given resource
         """
-        exports = tuple()
-        for plugin_name in self.get("plugins", {}):
-            config = self.load_plugin_config(plugin_name)
-            exports += config.get("exports", {}).get(resource_name, ())
-        return list(exports)
+        return list(self.plugin_registry.exports.get(resource_name, ()))
 
     def get_plugin_includes(self, resource_name):
         """Returns a list of all `includes` for the given resource from all
@@ -327,21 +794,25 @@ class Settings:
         :return: dictionary of HTTP method: list of includes
 
         """
-        includes = set()
-        for plugin_name in self.get("plugins", {}):
-            config = self.load_plugin_config(plugin_name)
-            includes_config = config.get("includes")
-            if includes_config:
-                includes |= set(includes_config.get(resource_name, ()))
-        return list(includes)
+        return list(self.plugin_registry.includes.get(resource_name, ()))
 
     @property
     def translations(self):
         return self.get("translations", {})
 
+    @property
+    def translation_catalog(self):
+        catalog = self._translation_catalog
+        if catalog is None:
+            catalog = self._translation_catalog = TranslationCatalog(
+                self.get("translations", {}),
+                fallback=self.get("translation_fallback", "en"),
+            )
+        return catalog
+
     def translate(self, language, key, *args, **kwargs):
-        translation = self.get("translations.{}.{}".format(key, language))
-        if not translation:
+        translation = self.translation_catalog.get(language, key)
+        if translation is None:
             return "[no translation for language {} and key {}]".format(language, key)
         return translation.format(*args, **kwargs)
 
@@ -353,16 +824,71 @@ def get_func_by_name(name):
     return getattr(module, func_name)
 
 
-def load_settings(filenames):
-    settings_dict = {}
+def load_settings(filenames, cache_dir=None):
+    """
+    Loads the given YAML files and merges them into a single settings
+    dictionary. If a cache directory is given, the result is stored there
+    and reused as long as the names and contents of the files are the same.
+    """
+    contents = []
     for filename in filenames:
-        with open(filename, "r") as yaml_file:
-            settings_yaml = yaml.load(yaml_file.read(), Loader=yaml.FullLoader)
-            if settings_yaml is None:
-                continue
-            c = {"cwd": os.path.dirname(os.path.abspath(filename))}
-            interpolate(settings_yaml, c)
-            update(settings_dict, settings_yaml)
+        with open(filename, "rb") as yaml_file:
+            contents.append(yaml_file.read())
+
+    if cache_dir is None:
+        return parse_settings(filenames, contents)
+
+    names = hashlib.sha256()
+    fingerprint = hashlib.sha256(str(SETTINGS_CACHE_VERSION).encode("utf-8"))
+    for filename, content in zip(filenames, contents):
+        names.update(os.path.abspath(filename).encode("utf-8") + b"\0")
+        fingerprint.update(hashlib.sha256(content).digest())
+    cache_path = os.path.join(
+        cache_dir, "settings-{}.pickle".format(names.hexdigest()[:16])
+    )
+
+    try:
+        with open(cache_path, "rb") as cache_file:
+            cached_fingerprint, settings_dict = pickle.load(cache_file)
+        if cached_fingerprint == fingerprint.hexdigest():
+            return settings_dict
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.warning("Cannot read settings cache {}".format(cache_path))
+
+    settings_dict = parse_settings(filenames, contents)
+
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        # we write to a temporary file first so that other processes never
+        # read a partially written cache file
+        tmp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        # the settings contain secrets (e.g. the encryption key), so only we
+        # may read them, even if the cache directory existed before
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as cache_file:
+            pickle.dump((fingerprint.hexdigest(), settings_dict), cache_file)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        logger.warning("Cannot write settings cache {}".format(cache_path))
+
+    return settings_dict
+
+
+def parse_settings(filenames, contents):
+    settings_dict = {}
+    for filename, content in zip(filenames, contents):
+        settings_yaml = yaml.load(content, Loader=YAMLLoader)
+        if settings_yaml is None:
+            continue
+        c = {"cwd": os.path.dirname(os.path.abspath(filename))}
+        interpolate(settings_yaml, c)
+        update(settings_dict, settings_yaml)
     return settings_dict
 
 
@@ -0,0 +1,41 @@
+"""
+Measures how long the individual startup steps take. This module is run in
+a fresh interpreter by the `startup-profile` command, so it must not import
+anything from Worf at module level.
+"""
+
+import importlib
+import json
+import time
+import sys
+
+
+def measure(app=True):
+    timings = []
+
+    def step(name, f):
+        modules = len(sys.modules)
+        start = time.perf_counter()
+        result = f()
+        timings.append(
+            {
+                "step": name,
+                "seconds": time.perf_counter() - start,
+                "modules": len(sys.modules) - modules,
+            }
+        )
+        return result
+
+    settings = step(
+        "settings", lambda: importlib.import_module("worf.settings").settings
+    )
+    for name in settings.order_plugins():
+        step("plugin:{}".format(name), lambda: settings.import_plugin_module(name))
+    step("initialize", settings.initialize)
+    if app:
+        step("api", lambda: importlib.import_module("worf.api.app").get_app(settings))
+    return timings
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure(app="--no-app" not in sys.argv)))
@@ -0,0 +1,117 @@
+from collections.abc import Mapping
+
+import string
+import logging
+
+logger = logging.getLogger(__name__)
+
+formatter = string.Formatter()
+
+
+class Template:
+
+    """
+    A parsed translation. Texts without replacement fields are formatted
+    once when they are compiled, all others are formatted on every use.
+    """
+
+    __slots__ = ("text", "static")
+
+    def __init__(self, text):
+        fields = [
+            field for _, field, _, _ in formatter.parse(text) if field is not None
+        ]
+        self.static = not fields
+        self.text = text.format() if self.static else text
+
+    def format(self, *args, **kwargs):
+        if self.static:
+            return self.text
+        return self.text.format(*args, **kwargs)
+
+
+def collect(d, prefix=""):
+    """
+    Returns a dictionary that maps the key of every translation in the given
+    tree (e.g. `users.already-exists`) to its texts by language.
+    """
+    translations = {}
+    for key, value in d.items():
+        if not isinstance(value, Mapping):
+            continue
+        if all(isinstance(v, str) for v in value.values()):
+            translations[prefix + key] = value
+        else:
+            translations.update(collect(value, prefix + key + "."))
+    return translations
+
+
+class TranslationCatalog:
+
+    """
+    Holds the parsed translations for every language. Texts that are missing
+    for a language are taken from its base language (e.g. `de` for `de-at`)
+    or from the fallback language, and are reported when the catalog is
+    compiled instead of when they are requested.
+    """
+
+    def __init__(self, translations, fallback="en"):
+        self.fallback = fallback
+        self.errors = []
+        texts = collect(translations or {})
+        self.languages = sorted(
+            {language for values in texts.values() for language in values}
+        )
+        self.catalog = {language: {} for language in self.languages}
+        for key, values in texts.items():
+            for language, text in values.items():
+                if not text:
+                    continue
+                try:
+                    self.catalog[language][key] = Template(text)
+                except ValueError as e:
+                    self.errors.append((key, language, str(e)))
+        self.missing = {
+            language: sorted(set(texts) - set(self.catalog[language]))
+            for language in self.languages
+        }
+        self.resolved = {
+            language: self.resolve(language) for language in self.languages
+        }
+        self.report()
+
+    def report(self):
+        for key, language, error in self.errors:
+            logger.error(
+                "Invalid translation for key {} and language {}: {}".format(
+                    key, language, error
+                )
+            )
+        for language, keys in self.missing.items():
+            if not keys:
+                continue
+            logger.debug(
+                "{} translations missing for language {}: {}".format(
+                    len(keys), language, ", ".join(keys)
+                )
+            )
+
+    def resolve(self, language):
+        """
+        Returns the templates for the given language, including those taken
+        from its base language and the fallback language.
+        """
+        languages = [self.fallback]
+        if "-" in language:
+            languages.append(language.split("-")[0])
+        languages.append(language)
+        templates = {}
+        for l in languages:
+            templates.update(self.catalog.get(l, {}))
+        return templates
+
+    def get(self, language, key):
+        templates = self.resolved.get(language)
+        if templates is None:
+            templates = self.resolved[language] = self.resolve(language)
+        return templates.get(key)
@@ -8,5 +8,7 @@ the settings before generating the application object.
 
 # we initialize the settings
 settings.initialize()
+# we import all lazily loaded plugin modules so that all tasks are registered
+settings.plugin_registry.resolve_all()
 # we make the application object available
 app = settings.worker.celery